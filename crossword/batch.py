@@ -0,0 +1,133 @@
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+
+from crossword import *
+from generate import CrosswordCreator
+
+# Solver state, set in each worker
+worker = dict()
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [5, 6]:
+        sys.exit(
+            "Usage: python batch.py structure words count output [timeout]"
+        )
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    count = int(sys.argv[3])
+    output = sys.argv[4]
+    timeout = float(sys.argv[5]) if len(sys.argv) == 6 else None
+
+    # Generate crosswords
+    crossword = Crossword(structure, words)
+    start = time.perf_counter()
+    results = generate_batch(crossword, count, output, timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    # Print summary
+    distinct = [result for result in results if result["file"]]
+    print(f"{len(results)} of {count} solves finished, "
+          f"{len(distinct)} distinct solutions in {elapsed:.3f}s")
+
+
+def generate_batch(crossword, count, output, timeout=None, processes=None,
+                   seed=0):
+    """
+    Solve `crossword` `count` times with seeds `seed`, `seed` + 1, ... in a
+    pool of `processes` worker processes, and write each distinct solution
+    to the directory `output` as it arrives, as text and, if PIL is
+    installed, as a PNG image. Stops every worker once `timeout` seconds
+    have passed.
+
+    Return one dictionary per finished solve, with its seed, nodes, time
+    in seconds and the name of the file it was written to (None if there
+    was no solution or the solution had already been found).
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    os.makedirs(output, exist_ok=True)
+    png = importlib.util.find_spec("PIL") is not None
+
+    # Node and arc consistency only depend on the puzzle, so they are
+    # enforced once and the resulting domains are shared by every solve
+    creator = CrosswordCreator(crossword)
+    creator.enforce_node_consistency()
+    if not creator.ac3():
+        return []
+
+    results = []
+    seen = set()
+    pool = multiprocessing.Pool(
+        processes, initialize, (crossword, creator.domains)
+    )
+    try:
+        solves = pool.imap_unordered(solve_seed, range(seed, seed + count))
+        for _ in range(count):
+            try:
+                if deadline is None:
+                    solved, words, nodes, elapsed = solves.next()
+                else:
+                    solved, words, nodes, elapsed = solves.next(
+                        max(deadline - time.monotonic(), 0)
+                    )
+            except multiprocessing.TimeoutError:
+                print("Timed out.")
+                break
+
+            result = {
+                "seed": solved,
+                "nodes": nodes,
+                "seconds": elapsed,
+                "file": None
+            }
+            if words is None:
+                status = "no solution"
+            elif words in seen:
+                status = "duplicate"
+            else:
+                seen.add(words)
+                assignment = dict(zip(crossword.ordered, words))
+                name = os.path.join(output, f"crossword{len(seen)}")
+                with open(f"{name}.txt", "w") as f:
+                    f.write(creator.text(assignment) + "\n")
+                if png:
+                    creator.save(assignment, f"{name}.png")
+                result["file"] = f"{name}.txt"
+                status = result["file"]
+            results.append(result)
+            print(f"Seed {solved}: {nodes} nodes, {elapsed:.3f}s, {status}")
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
+
+def initialize(crossword, domains):
+    """Keeps the puzzle and its consistent domains once per worker process."""
+    worker["crossword"] = crossword
+    worker["domains"] = domains
+
+
+def solve_seed(seed):
+    """
+    Solve the worker's puzzle from its consistent domains, with value
+    order randomized by `seed`.
+    Return (seed, words by variable id or None, nodes, seconds).
+    """
+    creator = CrosswordCreator(worker["crossword"], seed=seed)
+    assignment = creator.solve_from(worker["domains"])
+    if assignment is None:
+        return seed, None, creator.nodes, creator.elapsed
+    words = tuple(assignment[var] for var in worker["crossword"].ordered)
+    return seed, words, creator.nodes, creator.elapsed
+
+
+if __name__ == "__main__":
+    main()
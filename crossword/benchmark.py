@@ -0,0 +1,222 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from crossword import *
+from generate import CrosswordCreator
+from structures import (
+    MAX_LENGTH, MIN_LENGTH, random_structure, write_structure
+)
+
+# Bundled structures, solved with every bundled word list
+STRUCTURES = ["data/structure0.txt", "data/structure1.txt",
+              "data/structure2.txt"]
+WORDS = ["data/words0.txt", "data/words1.txt", "data/words2.txt"]
+
+# Generated structures: grid sizes, densities and seeds for each of them
+SIZES = [9, 15, 21]
+DENSITIES = [0.4, 0.6]
+SEEDS = 1
+
+# Word lists, as (source, number of words): words are sampled from the
+# source file, or made up of random letters if the source is "synthetic"
+VOCABULARIES = [
+    ("data/words2.txt", 1000),
+    ("data/words2.txt", 3000),
+    ("synthetic", 20000)
+]
+
+# Solver settings to compare, as keyword arguments to CrosswordCreator
+SETTINGS = {
+    "plain": dict(inference=None, mrv=False, lcv=False),
+    "mrv+lcv": dict(inference=None),
+    "mrv+lcv+backjumping": dict(inference=None, backjumping=True),
+    "forward": dict(inference="forward"),
+    "forward+backjumping": dict(inference="forward", backjumping=True),
+    "mac": dict(inference="mac"),
+    "mac+backjumping": dict(inference="mac", backjumping=True)
+}
+
+# Settings compared without and with backjumping, for nodes saved
+BACKJUMPING = [
+    ("mrv+lcv", "mrv+lcv+backjumping"),
+    ("forward", "forward+backjumping"),
+    ("mac", "mac+backjumping")
+]
+
+# Nodes after which a search is abandoned
+LIMIT = 1000
+
+# Relative frequencies of letters in English text, for synthetic words
+FREQUENCIES = {
+    "A": 8.2, "B": 1.5, "C": 2.8, "D": 4.3, "E": 12.7, "F": 2.2, "G": 2.0,
+    "H": 6.1, "I": 7.0, "J": 0.2, "K": 0.8, "L": 4.0, "M": 2.4, "N": 6.7,
+    "O": 7.5, "P": 1.9, "Q": 0.1, "R": 6.0, "S": 6.3, "T": 9.1, "U": 2.8,
+    "V": 1.0, "W": 2.4, "X": 0.2, "Y": 2.0, "Z": 0.1
+}
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [results.json]")
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmark(directory)
+    print(f"{len(results)} solves in {time.perf_counter() - start:.1f}s")
+    for line in nodes_saved(results):
+        print(line)
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def run_benchmark(directory, seed=0):
+    """
+    Solve every bundled structure with every bundled word list, and every
+    structure generated into `directory` with every word list generated
+    there, under each of the SETTINGS. Print and return one result
+    dictionary per solve.
+    """
+    vocabularies = []
+    for source, count in VOCABULARIES:
+        name = f"{os.path.basename(source).split('.')[0]}-{count}"
+        filename = os.path.join(directory, f"{name}.txt")
+        if source == "synthetic":
+            words = synthetic_words(count, seed)
+        else:
+            words = sample_words(source, count, seed)
+        with open(filename, "w") as f:
+            f.write("\n".join(words) + "\n")
+        vocabularies.append((name, filename))
+
+    puzzles = [
+        (structure, vocabulary, vocabulary)
+        for structure in STRUCTURES for vocabulary in WORDS
+    ]
+    for size in SIZES:
+        for density in DENSITIES:
+            for structure_seed in range(seed, seed + SEEDS):
+                structure = random_structure(
+                    size, size, density, structure_seed
+                )
+                filename = os.path.join(
+                    directory, f"{size}x{size}-{density}-{structure_seed}.txt"
+                )
+                write_structure(structure, filename)
+                for vocabulary, words in vocabularies:
+                    puzzles.append((filename, vocabulary, words))
+
+    results = []
+    for structure, vocabulary, words in puzzles:
+        crossword = Crossword(structure, words)
+        for setting in SETTINGS:
+            result = measure(crossword, setting)
+            result.update({
+                "structure": os.path.basename(structure),
+                "variables": len(crossword.variables),
+                "vocabulary": os.path.basename(vocabulary)
+            })
+            results.append(result)
+            print(describe(result), flush=True)
+    return results
+
+
+def measure(crossword, setting):
+    """
+    Solve `crossword` with the solver `setting`, once timed and once under
+    tracemalloc for the peak memory, and return a result dictionary.
+    """
+    creator = CrosswordCreator(crossword, limit=LIMIT, **SETTINGS[setting])
+    assignment = creator.solve()
+    if creator.aborted:
+        status = "limit"
+    elif assignment is None:
+        status = "none"
+    else:
+        status = "solved"
+    result = {
+        "setting": setting,
+        "status": status,
+        "seconds": creator.elapsed,
+        "nodes": creator.nodes,
+        "revisions": creator.revisions,
+        "backjumps": creator.backjumps
+    }
+
+    # Tracing allocations slows the solver down, so memory is measured
+    # in a second run
+    creator = CrosswordCreator(crossword, limit=LIMIT, **SETTINGS[setting])
+    tracemalloc.start()
+    creator.solve()
+    result["peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def describe(result):
+    """Return a one-line description of a result from `measure`."""
+    return (
+        f"{result['structure']:16} {result['variables']:3} variables  "
+        f"{result['vocabulary']:12} {result['setting']:20} "
+        f"{result['status']:6} {result['seconds']:8.3f}s "
+        f"{result['nodes']:6} nodes {result['revisions']:8} revisions "
+        f"{result['peak'] / 1024:9.1f} KiB"
+    )
+
+
+def nodes_saved(results):
+    """
+    Return one line per pair of settings in BACKJUMPING, with the total
+    nodes searched without and with backjumping over the puzzles that both
+    searches finished.
+    """
+    nodes = dict()
+    for result in results:
+        if result["status"] != "limit":
+            key = (result["structure"], result["vocabulary"])
+            nodes[key, result["setting"]] = result["nodes"]
+    lines = []
+    for plain, backjumping in BACKJUMPING:
+        total = [0, 0]
+        for (puzzle, setting), count in nodes.items():
+            if setting == plain and (puzzle, backjumping) in nodes:
+                total[0] += count
+                total[1] += nodes[puzzle, backjumping]
+        if total[0] == 0:
+            continue
+        saved = total[0] - total[1]
+        lines.append(
+            f"{plain:8} {total[0]} nodes, {total[1]} with backjumping, "
+            f"{saved} saved ({100 * saved / total[0]:.1f}%)"
+        )
+    return lines
+
+
+def sample_words(filename, count, seed=None):
+    """Return `count` words sampled from the word list in `filename`."""
+    with open(filename) as f:
+        words = sorted(set(f.read().upper().split()))
+    return random.Random(seed).sample(words, min(count, len(words)))
+
+
+def synthetic_words(count, seed=None):
+    """
+    Return `count` distinct made-up words, with random lengths and letters
+    drawn with their frequencies in English.
+    """
+    rng = random.Random(seed)
+    letters = list(FREQUENCIES)
+    weights = list(FREQUENCIES.values())
+    words = set()
+    while len(words) < count:
+        length = rng.randint(MIN_LENGTH, MAX_LENGTH)
+        words.add("".join(rng.choices(letters, weights, k=length)))
+    return sorted(words)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import json
+import os
+from array import array
+
+
 class Variable():
 
     ACROSS = "across"
@@ -16,8 +21,20 @@ class Variable():
                  self.j + (k if self.direction == Variable.ACROSS else 0))
             )
 
+        # Dense integer id, set by the crossword the variable belongs to
+        self.id = None
+        self._hash = hash((self.i, self.j, self.direction, self.length))
+
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self._hash
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled variable. String hashes differ between
+        processes, so the cached hash is computed again.
+        """
+        self.__dict__.update(state)
+        self._hash = hash((self.i, self.j, self.direction, self.length))
 
     def __eq__(self, other):
         return (
@@ -35,9 +52,186 @@ class Variable():
         return f"Variable({self.i}, {self.j}, {direction}, {self.length})"
 
 
+class WordIndex():
+    """
+    Index of a vocabulary by (length, position, letter).
+
+    Words of each length are numbered from 0 in sorted order, and every
+    posting list is a bitset over those numbers: bit k of
+    `postings[length][p][c]` is set if `words[length][k]` has letter c
+    at position p.
+    """
+
+    # Bump when the layout changes, so stale caches are rebuilt
+    VERSION = 2
+
+    def __init__(self, words):
+        self.words = dict()
+        for word in sorted(set(words)):
+            if word:
+                self.words.setdefault(len(word), []).append(word)
+
+        self.ids = dict()
+        self.postings = dict()
+        self.counts = dict()
+        for length, words in self.words.items():
+            # Set bits in byte arrays, since OR-ing into growing integers
+            # would take quadratic time on large vocabularies
+            size = len(words) // 8 + 1
+            arrays = [dict() for _ in range(length)]
+            for k, word in enumerate(words):
+                self.ids[word] = k
+                byte, bit = divmod(k, 8)
+                for p, c in enumerate(word):
+                    if c not in arrays[p]:
+                        arrays[p][c] = bytearray(size)
+                    arrays[p][c][byte] |= 1 << bit
+            self.postings[length] = [
+                {
+                    c: int.from_bytes(array, "little")
+                    for c, array in position.items()
+                }
+                for position in arrays
+            ]
+            self.counts[length] = [
+                {c: bin(bits).count("1") for c, bits in position.items()}
+                for position in self.postings[length]
+            ]
+
+    @classmethod
+    def load(cls, words_file, cache=False):
+        """
+        Return the index of the vocabulary in `words_file`.
+        If `cache` is True, the index is saved as JSON next to the file and
+        loaded from there while the file is unchanged; a cache that cannot
+        be read for any reason is rebuilt.
+        """
+        cache_file = words_file + ".index"
+        stat = os.stat(words_file)
+        key = [cls.VERSION, stat.st_size, stat.st_mtime_ns]
+        if cache:
+            try:
+                with open(cache_file) as f:
+                    contents = json.load(f)
+                if contents["key"] == key:
+                    return cls.from_json(contents)
+            except Exception:
+                pass
+
+        with open(words_file) as f:
+            index = cls(f.read().upper().splitlines())
+        if cache:
+            try:
+                with open(cache_file, "w") as f:
+                    json.dump(index.to_json(key), f)
+            except OSError:
+                pass
+        return index
+
+    def to_json(self, key):
+        """
+        Return the index as a JSON-serializable dictionary, with the word
+        lists and each posting list as a hexadecimal string.
+        """
+        return {
+            "key": key,
+            "words": {
+                str(length): words for length, words in self.words.items()
+            },
+            "postings": {
+                str(length): [
+                    {c: format(bits, "x") for c, bits in position.items()}
+                    for position in postings
+                ]
+                for length, postings in self.postings.items()
+            }
+        }
+
+    @classmethod
+    def from_json(cls, contents):
+        """Return the index stored in a dictionary from `to_json`."""
+        index = cls([])
+        for length, words in contents["words"].items():
+            length = int(length)
+            index.words[length] = [str(word) for word in words]
+            for k, word in enumerate(index.words[length]):
+                if len(word) != length:
+                    raise ValueError(f"{word} is not of length {length}")
+                index.ids[word] = k
+            index.postings[length] = [
+                {str(c): int(bits, 16) for c, bits in position.items()}
+                for position in contents["postings"][str(length)]
+            ]
+            if len(index.postings[length]) != length:
+                raise ValueError(f"wrong number of postings for {length}")
+            index.counts[length] = [
+                {c: bin(bits).count("1") for c, bits in position.items()}
+                for position in index.postings[length]
+            ]
+        return index
+
+    def vocabulary(self):
+        """Return the set of all words in the index."""
+        return set(self.ids)
+
+    def all(self, length):
+        """Return the bitset of all words of `length`."""
+        return (1 << len(self.words.get(length, []))) - 1
+
+    def decode(self, length, bits):
+        """Return the list of words of `length` in bitset `bits`."""
+        words = []
+        while bits:
+            low = bits & -bits
+            words.append(self.words[length][low.bit_length() - 1])
+            bits ^= low
+        return words
+
+    def matching(self, pattern):
+        """
+        Return the bitset of words matching `pattern`, a string with a letter
+        at each known position and "_" elsewhere, e.g. "__E__R_".
+        """
+        length = len(pattern)
+        if length not in self.postings:
+            return 0
+        postings = self.postings[length]
+        constraints = [
+            (self.counts[length][p].get(c, 0), p, c)
+            for p, c in enumerate(pattern.upper()) if c != "_"
+        ]
+
+        # Intersect the shortest posting lists first
+        bits = self.all(length)
+        for _, p, c in sorted(constraints):
+            bits &= postings[p].get(c, 0)
+            if not bits:
+                break
+        return bits
+
+    def query(self, pattern):
+        """Return the list of words matching `pattern`."""
+        return self.decode(len(pattern), self.matching(pattern))
+
+    def count(self, pattern):
+        """Return the number of words matching `pattern`."""
+        length = len(pattern)
+        if length not in self.postings:
+            return 0
+        known = [(p, c) for p, c in enumerate(pattern.upper()) if c != "_"]
+
+        # No intersection needed for zero or one known letter
+        if not known:
+            return len(self.words[length])
+        if len(known) == 1:
+            p, c = known[0]
+            return self.counts[length][p].get(c, 0)
+        return bin(self.matching(pattern)).count("1")
+
+
 class Crossword():
 
-    def __init__(self, structure_file, words_file):
+    def __init__(self, structure_file, words_file, cache=False):
 
         # Determine structure of crossword
         with open(structure_file) as f:
@@ -57,9 +251,10 @@ class Crossword():
                         row.append(False)
                 self.structure.append(row)
 
-        # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # Save vocabulary list, indexed by (length, position, letter),
+        # optionally cached next to the words file
+        self.index = WordIndex.load(words_file, cache)
+        self.words = self.index.vocabulary()
 
         # Determine variable set
         self.variables = set()
@@ -104,30 +299,66 @@ class Crossword():
                             length=length
                         ))
 
+        # Number the variables densely, in reading order
+        self.ordered = sorted(
+            self.variables, key=lambda v: (v.i, v.j, v.direction)
+        )
+        for k, var in enumerate(self.ordered):
+            var.id = k
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        starting = dict()
+        for var in self.ordered:
+            for k, cell in enumerate(var.cells):
+                starting.setdefault(cell, []).append((var, k))
+        self.overlaps = {
+            (v1, v2): None
+            for v1 in self.variables for v2 in self.variables if v1 != v2
+        }
+        for crossing in starting.values():
+            for v1, k1 in crossing:
+                for v2, k2 in crossing:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+
+        # The same overlaps as integer tables, indexed by variable id and
+        # then by slot, the position of a neighbor in `adjacent`:
+        #    adjacent[x][s]: id of the s-th neighbor y of x
+        #    overlap_x[x][s], overlap_y[x][s]: x's and y's overlapping
+        #        character positions
+        #    reverse[x][s]: slot of x among y's neighbors
+        self.adjacent = [array("H") for _ in self.ordered]
+        self.overlap_x = [array("H") for _ in self.ordered]
+        self.overlap_y = [array("H") for _ in self.ordered]
+        for crossing in starting.values():
+            for v1, k1 in crossing:
+                for v2, k2 in crossing:
+                    if v1 != v2:
+                        self.adjacent[v1.id].append(v2.id)
+                        self.overlap_x[v1.id].append(k1)
+                        self.overlap_y[v1.id].append(k2)
+        self.reverse = [
+            array("H", [
+                self.adjacent[y].index(x) for y in self.adjacent[x]
+            ])
+            for x in range(len(self.ordered))
+        ]
+        self.lengths = array("H", [var.length for var in self.ordered])
+        self.same_length = [
+            array("H", [
+                other.id for other in self.ordered
+                if other.length == var.length and other != var
+            ])
+            for var in self.ordered
+        ]
+        self.neighbor_sets = [
+            frozenset(self.ordered[y] for y in self.adjacent[x])
+            for x in range(len(self.ordered))
+        ]
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return set(self.neighbor_sets[var.id])
@@ -1,20 +1,90 @@
+import random
 import sys
-import copy
+import time
+
+from collections import deque
 
 from crossword import *
 
+# Most nogoods remembered by conflict-directed backjumping
+NOGOODS = 10000
+
+
+class SearchLimit(Exception):
+    """Raised when the search expands more nodes than its limit."""
+
 
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    def __init__(self, crossword, inference="mac", seed=None,
+                 backjumping=False, limit=None, mrv=True, lcv=True):
         """
         Create new CSP crossword generate.
+        `inference` is how assignments are propagated during backtracking:
+        None, "forward" (forward checking) or "mac" (arc consistency).
+        `mrv` and `lcv` turn the variable ordering (minimum remaining values,
+        then degree) and the value ordering (least constraining value) on;
+        without them, variables and values are tried in a fixed order.
+        If `seed` is given, values that are equally constraining are tried
+        in a random order, so different seeds can find different solutions.
+        If `backjumping` is True, the search jumps back to the cause of each
+        dead end instead of the previous variable, and remembers nogoods.
+        If `limit` is given, `solve` gives up after expanding that many nodes.
         """
         self.crossword = crossword
-        self.domains = {
-            var: self.crossword.words.copy()
-            for var in self.crossword.variables
-        }
+        self.inference = inference
+        self.random = random.Random(seed) if seed is not None else None
+        self.backjumping = backjumping
+        self.limit = limit
+        self.mrv = mrv
+        self.lcv = lcv
+
+        # Search statistics, filled in by `solve`
+        self.nodes = 0
+        self.elapsed = 0
+        self.aborted = False
+        self.backjumps = 0
+        self.pruned = 0
+        self.revisions = 0
+
+        # Search state, set up by `backtrack`
+        self.grid = None
+        self.covered = None
+        self.used = None
+        self.assigned = None
+
+        # Backjumping state: for each variable, a bitset of the ids of the
+        # assigned variables that its domain was pruned because of; the
+        # conflict set of the last dead end; and the learned nogoods
+        self.reasons = None
+        self.conflict = 0
+        self.wiped = None
+        self.nogoods = None
+        self.learned = None
+
+        # A domain is a bitset over the words of the variable's length,
+        # in which bit k means that self.index.words[length][k] is a
+        # possible value. Domains are listed by variable id
+        self.index = self.crossword.index
+        self.domains = [
+            self.index.all(var.length) for var in self.crossword.ordered
+        ]
+        self.postings = [
+            self.index.postings.get(var.length)
+            for var in self.crossword.ordered
+        ]
+
+    def domain_words(self, var):
+        """
+        Return a list of the words in the domain of `var`.
+        """
+        return self.index.decode(var.length, self.domains[var.id])
+
+    def domain_size(self, var):
+        """
+        Return the number of words in the domain of `var`.
+        """
+        return bin(self.domains[var.id]).count("1")
 
     def letter_grid(self, assignment):
         """
@@ -36,63 +106,96 @@ class CrosswordCreator():
         """
         Print crossword assignment to the terminal.
         """
+        print(self.text(assignment))
+
+    def text(self, assignment):
+        """
+        Return crossword assignment as text, one line per row.
+        """
         letters = self.letter_grid(assignment)
+        rows = []
         for i in range(self.crossword.height):
+            row = ""
             for j in range(self.crossword.width):
                 if self.crossword.structure[i][j]:
-                    print(letters[i][j] or " ", end="")
+                    row += letters[i][j] or " "
                 else:
-                    print("█", end="")
-            print()
+                    row += "█"
+            rows.append(row)
+        return "\n".join(rows)
 
-    def save(self, assignment, filename):
+    def save(self, assignment, filename, thumbnail=False):
         """
-        Save crossword assignment to an image file.
+        Save crossword assignment to an image file, or a smaller thumbnail.
         """
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        interior_size = cell_size - 2 * cell_border
-        letters = self.letter_grid(assignment)
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.crossword.width * cell_size,
-             self.crossword.height * cell_size),
-            "black"
+        self.renderer(thumbnail).save(
+            self.crossword.structure, self.letter_grid(assignment), filename
         )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
 
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                if self.crossword.structure[i][j]:
-                    draw.rectangle(rect, fill="white")
-                    if letters[i][j]:
-                        w, h = draw.textsize(letters[i][j], font=font)
-                        draw.text(
-                            (rect[0][0] + ((interior_size - w) / 2),
-                             rect[0][1] + ((interior_size - h) / 2) - 10),
-                            letters[i][j], fill="black", font=font
-                        )
+    def save_all(self, assignments, filenames, thumbnail=False):
+        """
+        Save each crossword assignment in `assignments` to the image file
+        with the matching name in `filenames`.
+        """
+        self.renderer(thumbnail).save_all(
+            self.crossword.structure,
+            [self.letter_grid(assignment) for assignment in assignments],
+            filenames
+        )
 
-        img.save(filename)
+    def renderer(self, thumbnail=False):
+        """
+        Return the shared image renderer, at thumbnail scale if `thumbnail`.
+        """
+        import render
+        return render.renderer(render.THUMBNAIL if thumbnail else 1)
 
     def solve(self):
         """
         Enforce node and arc consistency, and then solve the CSP.
         """
+        start = time.perf_counter()
+        self.reset_statistics()
         self.enforce_node_consistency()
-        self.ac3()
-        return self.backtrack(dict())
+        assignment = None
+        if self.ac3():
+            assignment = self.limited_backtrack()
+        self.elapsed = time.perf_counter() - start
+        return assignment
+
+    def solve_from(self, domains):
+        """
+        Solve the CSP by backtracking alone, starting from `domains`, a list
+        by variable id of domains that are already node and arc consistent,
+        such as another creator's after `solve` or `ac3`.
+        """
+        start = time.perf_counter()
+        self.reset_statistics()
+        self.domains = list(domains)
+        assignment = self.limited_backtrack()
+        self.elapsed = time.perf_counter() - start
+        return assignment
+
+    def reset_statistics(self):
+        """
+        Reset the search statistics before a new solve.
+        """
+        self.nodes = 0
+        self.aborted = False
+        self.backjumps = 0
+        self.pruned = 0
+        self.revisions = 0
+
+    def limited_backtrack(self):
+        """
+        Backtrack from an empty assignment, returning None and setting
+        `self.aborted` if the node limit is reached.
+        """
+        try:
+            return self.backtrack(dict())
+        except SearchLimit:
+            self.aborted = True
+            return None
 
     def enforce_node_consistency(self):
         """
@@ -100,44 +203,57 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-
         for variable in self.crossword.variables:
-            length_variable = variable.length
-            for word in self.crossword.words:
-                if len(word) != length_variable:
-                    self.domains[variable].remove(word)
-
+            self.domains[variable.id] &= self.index.all(variable.length)
 
     def revise(self, x, y):
         """
         Make variable `x` arc consistent with variable `y`.
-        To do so, remove values from `self.domains[x]` for which there is no
-        possible corresponding value for `y` in `self.domains[y]`.
+        To do so, remove values from the domain of `x` for which there is no
+        possible corresponding value for `y` in the domain of `y`.
 
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        # obtain the integers, which correspond to the index of x, y
-        overlap = self.crossword.overlaps[x, y]
-        bad_words = []
-        # sets
-        if overlap is not None:
-            for word_x in self.domains[x]:
-                revise = False
-                for word_y in self.domains[y]:
-                    if word_x[overlap[0]] == word_y[overlap[1]] and word_x != word_y:
-                        revise = True
-                        break
-                if not revise:
-                    bad_words.append(word_x)
-            for word in bad_words:
-                self.domains[x].remove(word)
-            if bad_words:
-                return True
-            else:
-                return False
-        else:
+        if self.crossword.overlaps[x, y] is None:
             return False
+        s = self.crossword.adjacent[x.id].index(y.id)
+        return self.revise_slot(x.id, s)
+
+    def revise_slot(self, x, s):
+        """
+        Make the variable with id `x` arc consistent with its neighbor in
+        slot `s`, as in `revise`.
+        """
+        self.revisions += 1
+        crossword = self.crossword
+        y = crossword.adjacent[x][s]
+        i = crossword.overlap_x[x][s]
+        j = crossword.overlap_y[x][s]
+        postings_x = self.postings[x]
+        postings_y = self.postings[y]
+
+        # A word for x is supported if y can still have its letter at the
+        # overlap, with some word other than itself
+        supported = 0
+        if postings_x and postings_y:
+            domain_y = self.domains[y]
+            same_length = crossword.lengths[x] == crossword.lengths[y]
+            for letter, words_y in postings_y[j].items():
+                candidates = domain_y & words_y
+                if not candidates:
+                    continue
+                words_x = postings_x[i].get(letter, 0)
+                if same_length and candidates & (candidates - 1) == 0:
+                    words_x &= ~candidates
+                supported |= words_x
+        revised = self.domains[x] & supported
+        if revised == self.domains[x]:
+            return False
+        self.domains[x] = revised
+        if self.reasons is not None:
+            self.reasons[x] |= self.explain(y)
+        return True
 
     def ac3(self, arcs=None):
         """
@@ -148,31 +264,37 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        starting_list_arcs = True
-        my_arcs = []
+        # Arcs are (variable id, slot of the neighbor) pairs
+        adjacent = self.crossword.adjacent
         if arcs is None:
-            for arc in self.crossword.variables:
-                for arc2 in self.crossword.neighbors(arc):
-                    if arc != arc2:
-                        # my_arcs is a set
-                        my_arcs.append(tuple((arc, arc2)))
-            starting_list_arcs = False
-
-        if starting_list_arcs:
-            queue = arcs
+            queue = [
+                (x, s)
+                for x in range(len(adjacent)) for s in range(len(adjacent[x]))
+            ]
         else:
-            queue = my_arcs
+            queue = [
+                (x.id, adjacent[x.id].index(y.id)) for x, y in arcs
+                if self.crossword.overlaps[x, y] is not None
+            ]
+        return self.propagate(queue)
 
+    def propagate(self, queue):
+        """
+        Run AC-3 on a `queue` of (variable id, slot) arcs.
+        Return False if some domain ends up empty, True otherwise.
+        """
+        adjacent = self.crossword.adjacent
+        reverse = self.crossword.reverse
         while queue:
-            (x, y) = queue.pop()
-            if self.revise(x, y):
-                if len(self.domains[x]) == 0:
+            x, s = queue.pop()
+            if self.revise_slot(x, s):
+                if self.domains[x] == 0:
+                    self.wiped = x
                     return False
-                neighbors = copy.deepcopy(self.crossword.neighbors(x))
-                if y in neighbors:
-                    neighbors = neighbors - {y}
-                for z in neighbors:
-                    queue.append(tuple((z, x)))
+                y = adjacent[x][s]
+                for t, z in enumerate(adjacent[x]):
+                    if z != y:
+                        queue.append((z, reverse[x][t]))
         return True
 
     def assignment_complete(self, assignment):
@@ -220,24 +342,48 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        # neighbors = self.crossword.neighbors(var)
-        # mapping = {values: 0 for values in self.domains[var]}
-        # # iteration through neighbour variables of var
-        # for variable in neighbors:
-        #     # domain values of var
-        #     for values, count in mapping.items():
-        #         # if the value of the var domain is in the domain of neighbor variable, then sum up
-        #         if values in self.domains[variable]:
-        #             mapping[values] += 1
-        # ascending = sorted(mapping.items(), key=lambda x: x[1], reverse=False)
-        # my_list = []
-        # for i in ascending:
-        #     my_list.append(i[0])
-        #
-        # return my_list
-        return self.domains[var]
-
-
+        words = self.domain_words(var)
+        if self.random is not None:
+            self.random.shuffle(words)
+        if not self.lcv:
+            return words
+
+        # For each unassigned neighbor, count how many of its values have
+        # each letter at the overlap; a value for `var` then rules out
+        # every other value of that neighbor
+        crossword = self.crossword
+        assigned = self.assigned_words(assignment)
+        x = var.id
+        neighbors = []
+        for s, y in enumerate(crossword.adjacent[x]):
+            if assigned[y]:
+                continue
+            i = crossword.overlap_x[x][s]
+            domain = self.domains[y]
+            postings = self.postings[y][crossword.overlap_y[x][s]]
+            counts = {
+                letter: bin(domain & words).count("1")
+                for letter, words in postings.items()
+            }
+            neighbors.append((i, bin(domain).count("1"), counts))
+
+        def ruled_out(word):
+            return sum(
+                size - counts.get(word[i], 0)
+                for i, size, counts in neighbors
+            )
+
+        return sorted(words, key=ruled_out)
+
+    def assigned_words(self, assignment):
+        """
+        Return a list, by variable id, of the word each variable has in
+        `assignment`, or None. During the search this is kept up to date by
+        `assign` and `unassign`.
+        """
+        if self.assigned is not None:
+            return self.assigned
+        return [assignment.get(var) for var in self.crossword.ordered]
 
     def select_unassigned_variable(self, assignment):
         """
@@ -247,9 +393,60 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        for variable in self.crossword.variables:
-            if variable not in assignment.keys():
-                return variable
+        adjacent = self.crossword.adjacent
+        assigned = self.assigned_words(assignment)
+        if not self.mrv:
+            return next(
+                var for var in self.crossword.ordered if not assigned[var.id]
+            )
+        best = min(
+            (x for x in range(len(adjacent)) if not assigned[x]),
+            key=lambda x: (
+                bin(self.domains[x]).count("1"), -len(adjacent[x])
+            )
+        )
+        return self.crossword.ordered[best]
+
+    def infer(self, var, assignment):
+        """
+        Propagate the assignment of `var` to the domains of the unassigned
+        variables, according to `self.inference`:
+            None: no propagation
+            "forward": forward checking, revising each neighbor of `var`
+            "mac": maintaining arc consistency, running AC-3 from the
+                   arcs of the neighbors of `var`
+
+        Return False if some domain ends up empty, True otherwise.
+        """
+        if self.inference is None:
+            return True
+
+        # The word cannot be used again anywhere else
+        x = var.id
+        bit = self.domains[x]
+        for other in self.crossword.same_length[x]:
+            if not self.assigned[other]:
+                self.domains[other] &= ~bit
+                if self.reasons is not None:
+                    self.reasons[other] |= 1 << x
+                if self.domains[other] == 0:
+                    self.wiped = other
+                    return False
+
+        reverse = self.crossword.reverse[x]
+        arcs = [
+            (y, reverse[s])
+            for s, y in enumerate(self.crossword.adjacent[x])
+            if not self.assigned[y]
+        ]
+        if self.inference == "forward":
+            for y, s in arcs:
+                self.revise_slot(y, s)
+                if self.domains[y] == 0:
+                    self.wiped = y
+                    return False
+            return True
+        return self.propagate(arcs)
 
     def backtrack(self, assignment):
         """
@@ -260,19 +457,210 @@ class CrosswordCreator():
 
         If no assignment is possible, return None.
         """
-        if self.assignment_complete(assignment):
+        if not self.consistent(assignment):
+            return None
+
+        # Track the letter in each cell and the words in use, so that each
+        # new word is checked against its own cells only
+        self.grid = [
+            [None for _ in range(self.crossword.width)]
+            for _ in range(self.crossword.height)
+        ]
+        self.covered = [
+            [0 for _ in range(self.crossword.width)]
+            for _ in range(self.crossword.height)
+        ]
+        self.used = set()
+        self.assigned = [None for _ in self.crossword.ordered]
+        partial = dict()
+        for var, word in assignment.items():
+            self.assign(var, word, partial)
+        try:
+            if not self.backjumping:
+                return self.search(partial)
+            self.reasons = [0 for _ in self.crossword.ordered]
+            self.nogoods = dict()
+            self.learned = deque()
+            return self.backjump(partial)
+        finally:
+            self.assigned = None
+            self.reasons = None
+            self.nogoods = None
+            self.learned = None
+
+    def assign(self, var, word, assignment):
+        """
+        Add `var` = `word` to `assignment` if it is consistent with the words
+        already assigned, in O(length of word).
+        Return True if the word was assigned, False otherwise.
+        """
+        if len(word) != var.length or word in self.used:
+            return False
+        for k, (i, j) in enumerate(var.cells):
+            if self.grid[i][j] is not None and self.grid[i][j] != word[k]:
+                return False
+        for k, (i, j) in enumerate(var.cells):
+            self.grid[i][j] = word[k]
+            self.covered[i][j] += 1
+        self.used.add(word)
+        self.assigned[var.id] = word
+        assignment[var] = word
+        return True
+
+    def unassign(self, var, assignment):
+        """
+        Remove `var` from `assignment`, undoing `assign` in O(length of word).
+        """
+        word = assignment.pop(var)
+        self.used.remove(word)
+        self.assigned[var.id] = None
+        for i, j in var.cells:
+            self.covered[i][j] -= 1
+            if self.covered[i][j] == 0:
+                self.grid[i][j] = None
+
+    def search(self, assignment):
+        """
+        Recursive part of `backtrack`, on a consistent `assignment` that is
+        mirrored in the search state.
+        """
+        self.visit()
+        if len(assignment) == len(self.crossword.variables):
             return assignment
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
-            assignment[var] = value
-            if self.consistent(assignment):
-                result = self.backtrack(assignment)
+            if not self.assign(var, value, assignment):
+                continue
+
+            # Domains are integers, so saving them is a shallow copy
+            saved = self.domains.copy()
+            self.domains[var.id] = 1 << self.index.ids[value]
+            if self.infer(var, assignment):
+                result = self.search(assignment)
                 if result is not None:
                     return result
-                else:
-                    assignment[var] = None
+            self.domains = saved
+            self.unassign(var, assignment)
         return None
 
+    def visit(self):
+        """
+        Count a search node, raising SearchLimit past `self.limit` nodes.
+        """
+        self.nodes += 1
+        if self.limit is not None and self.nodes > self.limit:
+            raise SearchLimit()
+
+    def backjump(self, assignment):
+        """
+        Recursive part of `backtrack` with conflict-directed backjumping.
+
+        When no value of a variable works, `self.conflict` is set to the
+        bitset of the assigned variables responsible, and every search
+        level whose variable is not among them returns at once, jumping
+        back to the most recent one. Each conflict is also remembered as a
+        nogood, so that the same combination of words is never tried again.
+        """
+        self.visit()
+        if len(assignment) == len(self.crossword.variables):
+            return assignment
+        var = self.select_unassigned_variable(assignment)
+        x = var.id
+        bit = 1 << x
+
+        # Values already removed from the domain of `var` count as failures
+        # caused by the variables that removed them
+        conflict = self.reasons[x]
+        for value in self.order_domain_values(var, assignment):
+            culprits = self.conflicts(var, value)
+            if culprits is not None:
+                conflict |= culprits
+                continue
+            self.assign(var, value, assignment)
+            saved = self.domains.copy()
+            reasons = self.reasons.copy()
+            self.domains[x] = 1 << self.index.ids[value]
+            if self.infer(var, assignment):
+                result = self.backjump(assignment)
+                if result is not None:
+                    return result
+                culprits = self.conflict
+            else:
+                culprits = self.explain(self.wiped)
+            self.domains = saved
+            self.reasons = reasons
+            self.unassign(var, assignment)
+
+            # If `var` played no part in the dead end, none of its other
+            # values can help, so jump back past it
+            if not culprits & bit:
+                self.backjumps += 1
+                self.conflict = culprits
+                return None
+            conflict |= culprits & ~bit
+
+        self.learn(conflict)
+        self.conflict = conflict
+        return None
+
+    def explain(self, x):
+        """
+        Return the bitset of assigned variables that the current domain of
+        the variable with id `x` depends on.
+        """
+        if self.assigned[x] is not None:
+            return self.reasons[x] | (1 << x)
+        return self.reasons[x]
+
+    def conflicts(self, var, value):
+        """
+        Return None if `value` can be assigned to `var`, or else the bitset
+        of assigned variables it conflicts with, directly or through a
+        learned nogood.
+        """
+        crossword = self.crossword
+        x = var.id
+        culprits = 0
+        if value in self.used:
+            culprits |= 1 << self.assigned.index(value)
+        for s, y in enumerate(crossword.adjacent[x]):
+            word = self.assigned[y]
+            if word is not None and (
+                word[crossword.overlap_y[x][s]]
+                != value[crossword.overlap_x[x][s]]
+            ):
+                culprits |= 1 << y
+        if culprits:
+            return culprits
+        for nogood in self.nogoods.get((x, value), ()):
+            if all(self.assigned[y] == word for y, word in nogood if y != x):
+                self.pruned += 1
+                culprits = 0
+                for y, _ in nogood:
+                    if y != x:
+                        culprits |= 1 << y
+                return culprits
+        return None
+
+    def learn(self, conflict):
+        """
+        Remember the words of the variables in `conflict` as a nogood,
+        forgetting the oldest nogood once there are more than NOGOODS.
+        """
+        nogood = tuple(
+            (y, self.assigned[y]) for y in range(len(self.assigned))
+            if conflict >> y & 1
+        )
+        if not nogood:
+            return
+        for member in nogood:
+            self.nogoods.setdefault(member, []).append(nogood)
+        self.learned.append(nogood)
+        if len(self.learned) > NOGOODS:
+            oldest = self.learned.popleft()
+            for member in oldest:
+                self.nogoods[member].remove(oldest)
+
 
 def main():
 
@@ -297,6 +685,7 @@ def main():
         creator.print(assignment)
         if output:
             creator.save(assignment, output)
+    print(f"Nodes: {creator.nodes}, time: {creator.elapsed:.3f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+from PIL import Image, ImageDraw, ImageFont
+
+# Size in pixels of a cell and of its border, at full resolution
+CELL_SIZE = 100
+CELL_BORDER = 2
+
+# Font for letters, and its size at full resolution
+FONT = "assets/fonts/OpenSans-Regular.ttf"
+FONT_SIZE = 80
+
+# Scale of thumbnails, relative to full resolution
+THUMBNAIL = 0.2
+
+# Letters rendered ahead of time
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Renderers by scale, created on first use
+renderers = dict()
+
+
+def renderer(scale=1):
+    """Return the shared renderer for `scale`, creating it if needed."""
+    if scale not in renderers:
+        renderers[scale] = Renderer(scale)
+    return renderers[scale]
+
+
+class Renderer():
+    """
+    Draws crossword images by pasting pre-rendered cell tiles.
+
+    The font is loaded and the blocked, empty and lettered tiles are drawn
+    once; the blocked and empty cells of a structure are composed once into
+    a background, and each image is a copy of that background with the
+    letter tiles pasted on top.
+    """
+
+    def __init__(self, scale=1, font=FONT):
+        self.scale = scale
+        self.cell_size = max(round(CELL_SIZE * scale), 2)
+        self.cell_border = max(round(CELL_BORDER * scale), 1)
+        self.font = ImageFont.truetype(font, max(round(FONT_SIZE * scale), 1))
+        self.blocked = Image.new(
+            "RGBA", (self.cell_size, self.cell_size), "black"
+        )
+        self.empty = self.tile(None)
+        self.tiles = {letter: self.tile(letter) for letter in LETTERS}
+        self.backgrounds = dict()
+
+    def tile(self, letter):
+        """Return the image of an open cell holding `letter` (or None)."""
+        img = self.blocked.copy()
+        draw = ImageDraw.Draw(img)
+        border = self.cell_border
+        interior_size = self.cell_size - 2 * border
+        draw.rectangle(
+            [(border, border),
+             (self.cell_size - border, self.cell_size - border)],
+            fill="white"
+        )
+        if letter:
+            _, _, w, h = draw.textbbox((0, 0), letter, font=self.font)
+            draw.text(
+                (border + ((interior_size - w) / 2),
+                 border + ((interior_size - h) / 2) - 10 * self.scale),
+                letter, fill="black", font=self.font
+            )
+        return img
+
+    def letter(self, letter):
+        """Return the tile for `letter`, drawing it on first use."""
+        if letter not in self.tiles:
+            self.tiles[letter] = self.tile(letter)
+        return self.tiles[letter]
+
+    def background(self, structure):
+        """
+        Return the image of `structure` (a 2D list of booleans, True for
+        open cells) with every open cell empty.
+        """
+        key = tuple(tuple(row) for row in structure)
+        if key not in self.backgrounds:
+            height = len(structure)
+            width = max(len(row) for row in structure)
+            img = Image.new(
+                "RGBA",
+                (width * self.cell_size, height * self.cell_size),
+                "black"
+            )
+            for i, row in enumerate(structure):
+                for j, cell in enumerate(row):
+                    if cell:
+                        img.paste(
+                            self.empty,
+                            (j * self.cell_size, i * self.cell_size)
+                        )
+            self.backgrounds[key] = img
+        return self.backgrounds[key]
+
+    def render(self, structure, letters):
+        """
+        Return the image of `structure` filled in with `letters`, a 2D list
+        of letters (or None) as returned by `CrosswordCreator.letter_grid`.
+        """
+        img = self.background(structure).copy()
+        for i, row in enumerate(structure):
+            for j, cell in enumerate(row):
+                if cell and letters[i][j]:
+                    img.paste(
+                        self.letter(letters[i][j]),
+                        (j * self.cell_size, i * self.cell_size)
+                    )
+        return img
+
+    def save(self, structure, letters, filename):
+        """Save the image of `structure` filled in with `letters`."""
+        self.render(structure, letters).save(filename)
+
+    def save_all(self, structure, grids, filenames):
+        """
+        Save an image for each 2D list of letters in `grids`, all for the
+        same `structure`, to the matching name in `filenames`.
+        """
+        for letters, filename in zip(grids, filenames):
+            self.save(structure, letters, filename)
@@ -0,0 +1,117 @@
+import random
+import sys
+
+# Shortest and longest words placed by the generator
+MIN_LENGTH = 3
+MAX_LENGTH = 12
+
+# Failed placements in a row before the generator gives up on density
+ATTEMPTS = 1000
+
+
+def main():
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python structures.py height width density [seed]")
+    height = int(sys.argv[1])
+    width = int(sys.argv[2])
+    density = float(sys.argv[3])
+    seed = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    for row in random_structure(height, width, density, seed):
+        print(row)
+
+
+def random_structure(height, width, density, seed=None,
+                     min_length=MIN_LENGTH, max_length=MAX_LENGTH):
+    """
+    Return a random crossword structure as a list of rows, in which "_"
+    is an open cell and "#" is a blocked cell.
+
+    Words are placed one at a time, each crossing a word already in the
+    grid, until `density` of the cells are open or no more words fit.
+    A word never runs alongside another, so every run of open cells is
+    exactly one of the placed words, and the grid is connected.
+    """
+    rng = random.Random(seed)
+    max_length = min(max_length, max(height, width))
+    grid = [[False for _ in range(width)] for _ in range(height)]
+
+    # Start with an across word in the middle row
+    length = rng.randint(min(min_length, width), min(max_length, width))
+    start = rng.randint(0, width - length)
+    cells = [(height // 2, j) for j in range(start, start + length)]
+    for i, j in cells:
+        grid[i][j] = True
+    open_cells = len(cells)
+
+    failures = 0
+    while open_cells < density * height * width and failures < ATTEMPTS:
+        # Cross a random open cell with a word in a random direction
+        i, j = rng.choice(cells)
+        di, dj = rng.choice([(1, 0), (0, 1)])
+        length = rng.randint(min_length, max_length)
+        offset = rng.randrange(length)
+        start = (i - di * offset, j - dj * offset)
+        if not fits(grid, start, (di, dj), length):
+            failures += 1
+            continue
+        failures = 0
+        for k in range(length):
+            cell = (start[0] + di * k, start[1] + dj * k)
+            if not grid[cell[0]][cell[1]]:
+                grid[cell[0]][cell[1]] = True
+                cells.append(cell)
+                open_cells += 1
+
+    return [
+        "".join("_" if cell else "#" for cell in row)
+        for row in grid
+    ]
+
+
+def fits(grid, start, direction, length):
+    """
+    Return True if a word of `length` can be placed from `start` in
+    `direction` (a (di, dj) step), crossing at least one open cell and
+    without touching any other word along its sides or ends.
+    """
+    height = len(grid)
+    width = len(grid[0])
+    di, dj = direction
+
+    def is_open(i, j):
+        return 0 <= i < height and 0 <= j < width and grid[i][j]
+
+    i, j = start
+    end = (i + di * (length - 1), j + dj * (length - 1))
+    if not (0 <= i < height and 0 <= j < width):
+        return False
+    if not (0 <= end[0] < height and 0 <= end[1] < width):
+        return False
+
+    # The cells just before and after the word must stay blocked
+    if is_open(i - di, j - dj) or is_open(end[0] + di, end[1] + dj):
+        return False
+
+    crossings = 0
+    for k in range(length):
+        ci, cj = i + di * k, j + dj * k
+        if grid[ci][cj]:
+            # An open cell may only be crossed by a perpendicular word,
+            # and two crossings cannot be next to each other
+            if is_open(ci - di, cj - dj) or is_open(ci + di, cj + dj):
+                return False
+            crossings += 1
+        elif is_open(ci + dj, cj + di) or is_open(ci - dj, cj - di):
+            return False
+    return crossings > 0
+
+
+def write_structure(rows, filename):
+    """Write a structure returned by `random_structure` to `filename`."""
+    with open(filename, "w") as f:
+        for row in rows:
+            f.write(row + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import json
+import sys
+import time
+
+from heredity import PROBS, brute_force
+from generate_family import generate_family
+from model import HeredityModel
+
+# Family sizes to benchmark
+SIZES = [2, 3, 4, 5, 6, 7, 8, 10, 12]
+
+# Brute force enumerates 6^n assignments, so stop it early
+BRUTE_FORCE_MAX = 7
+
+# Fraction of people whose trait is known
+OBSERVED = 0.5
+
+# Runs per engine per family; the fastest one is recorded
+REPEAT = 3
+
+# Largest difference between engines that still counts as agreement
+TOLERANCE = 1e-9
+
+
+def compiled(people):
+    """
+    Inference on the compiled tables for `PROBS`.
+    """
+    return HeredityModel.from_dict(PROBS).compile().infer(people)
+
+
+# Inference engines to compare, by name. Each takes the dictionary
+# returned by `heredity.load_data` and returns normalized distributions.
+ENGINES = {
+    "brute_force": brute_force,
+    "compiled": compiled
+}
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [results.json]")
+    results = run_benchmark(SIZES)
+    for result in results:
+        timings = ", ".join(
+            f"{engine}: {seconds:.4f}s"
+            for engine, seconds in result["seconds"].items()
+        )
+        status = "ok" if result["agree"] else "MISMATCH"
+        print(f"size {result['size']:3}  {timings}  [{status}]")
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "w") as f:
+            json.dump(results, f, indent=2)
+    if not all(result["agree"] for result in results):
+        sys.exit("Engines disagree")
+
+
+def run_benchmark(sizes, observed=OBSERVED, seed=0):
+    """
+    Time every engine on a random family of each size in `sizes`.
+    Return one result dictionary per size, recording the time taken by
+    each engine and whether all engines produced the same distributions.
+    """
+    results = []
+    for size in sizes:
+        people = generate_family(size, observed, seed=seed + size)
+        seconds = dict()
+        outputs = dict()
+        for name, engine in ENGINES.items():
+            if name == "brute_force" and size > BRUTE_FORCE_MAX:
+                continue
+            best = None
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                outputs[name] = engine(people)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            seconds[name] = best
+        difference = max_difference(list(outputs.values()))
+        results.append({
+            "size": size,
+            "observed": sum(
+                person["trait"] is not None for person in people.values()
+            ),
+            "seconds": seconds,
+            "max_difference": difference,
+            "agree": difference <= TOLERANCE
+        })
+    return results
+
+
+def max_difference(outputs):
+    """
+    Return the largest difference between any probability in the first
+    output and the same probability in the other outputs.
+    """
+    difference = 0
+    for other in outputs[1:]:
+        for person in outputs[0]:
+            for field in outputs[0][person]:
+                for value in outputs[0][person][field]:
+                    difference = max(difference, abs(
+                        outputs[0][person][field][value]
+                        - other[person][field][value]
+                    ))
+    return difference
+
+
+if __name__ == "__main__":
+    main()
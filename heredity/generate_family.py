@@ -0,0 +1,95 @@
+import csv
+import random
+import sys
+
+from heredity import PROBS
+from model import HeredityModel
+
+# Probability that a new child marries someone from outside the family
+MARRIAGE = 0.5
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python generate_family.py size observed [output.csv]")
+    size = int(sys.argv[1])
+    observed = float(sys.argv[2])
+    people = generate_family(size, observed)
+    if len(sys.argv) == 4:
+        save_family(people, sys.argv[3])
+    else:
+        save_family(people, sys.stdout)
+
+
+def generate_family(size, observed, model=None, seed=None):
+    """
+    Return a random family of `size` people, laid out like the dictionary
+    returned by `heredity.load_data`.
+
+    The family starts from one couple. Each new person is a child of a
+    random existing couple and may marry someone from outside the family,
+    who then starts a new couple, so families span several generations.
+    Genes and traits are sampled from `model` (defaults to `PROBS`), and
+    each trait is recorded with probability `observed`.
+    """
+    if size < 2:
+        raise ValueError("a family needs at least two people")
+    if model is None:
+        model = HeredityModel.from_dict(PROBS)
+    tables = model.compile()
+    rng = random.Random(seed)
+
+    people = dict()
+    genes = dict()
+    couples = []
+
+    def add_person(mother=None, father=None):
+        name = f"Person{len(people)}"
+        if mother is None:
+            weights = tables.prior
+        else:
+            weights = tables.inherit[genes[mother]][genes[father]]
+        genes[name] = rng.choices(range(3), weights=weights)[0]
+        trait = rng.random() < tables.penetrance[genes[name]][True]
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": trait if rng.random() < observed else None
+        }
+        return name
+
+    couples.append((add_person(), add_person()))
+    while len(people) < size:
+        mother, father = rng.choice(couples)
+        child = add_person(mother, father)
+        if len(people) < size and rng.random() < MARRIAGE:
+            spouse = add_person()
+            couples.append((child, spouse) if rng.random() < 0.5
+                           else (spouse, child))
+    return people
+
+
+def save_family(people, output):
+    """
+    Write `people` as a CSV that `heredity.load_data` can read.
+    `output` is a filename or an open file.
+    """
+    if isinstance(output, str):
+        with open(output, "w", newline="") as f:
+            save_family(people, f)
+        return
+    writer = csv.writer(output)
+    writer.writerow(["name", "mother", "father", "trait"])
+    for person in people.values():
+        trait = person["trait"]
+        writer.writerow([
+            person["name"],
+            person["mother"] or "",
+            person["father"] or "",
+            "" if trait is None else int(trait)
+        ])
+
+
+if __name__ == "__main__":
+    main()
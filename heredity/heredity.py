@@ -3,6 +3,8 @@ import itertools
 import sys
 import copy
 
+from model import HeredityModel
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -40,10 +42,27 @@ PROBS = {
 
 def main():
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python heredity.py data.csv [model.json]")
     people = load_data(sys.argv[1])
 
+    # With a custom model, look everything up in its compiled tables
+    if len(sys.argv) == 3:
+        model = HeredityModel.from_json(sys.argv[2])
+        print_probabilities(people, model.compile().infer(people))
+        return
+
+    probabilities = brute_force(people)
+
+    # Print results
+    print_probabilities(people, probabilities)
+
+
+def brute_force(people):
+    """
+    Compute gene and trait distributions for everyone in `people` by
+    enumerating every joint assignment under `PROBS`.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -62,8 +81,6 @@ def main():
 
     # Loop over all sets of people who might have the trait
     names = set(people)
-    print(names)
-    print(people)
     for have_trait in powerset(names):
 
         # Check if current set of people violates known information
@@ -83,8 +100,13 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
+
+def print_probabilities(people, probabilities):
+    """
+    Print gene and trait distributions for everyone in `people`.
+    """
     for person in people:
         print(f"{person}:")
         for field in probabilities[person]:
@@ -159,14 +181,14 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         else:
             # conditions for mother
             if people[person]["mother"] in one_gene:
-                parents["mother"] = (1 - PROBS["mutation"]) * 0.5
+                parents["mother"] = 0.5
             elif people[person]["mother"] in two_genes:
                 parents["mother"] = 1 - PROBS["mutation"]
             else:
                 parents["mother"] = PROBS["mutation"]
             # conditions for father
             if people[person]["father"] in one_gene:
-                parents["father"] = (1 - PROBS["mutation"]) * 0.5
+                parents["father"] = 0.5
             elif people[person]["father"] in two_genes:
                 parents["father"] = 1 - PROBS["mutation"]
             else:
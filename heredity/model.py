@@ -0,0 +1,310 @@
+import json
+
+
+class HeredityModel():
+    """
+    Parameters of the heredity Bayesian network.
+
+    A model has
+        - `gene`: unconditional probability of having 0, 1 or 2 copies
+          of the gene, for people whose parents are unknown
+        - `trait`: probability of showing the trait given 0, 1 or 2 copies
+        - `mutation`: probability that a passed (or not passed) gene mutates
+    """
+
+    def __init__(self, gene, trait, mutation):
+        self.gene = {int(g): float(p) for g, p in gene.items()}
+        self.trait = {
+            int(g): {
+                parse_bool(value): float(p)
+                for value, p in distribution.items()
+            }
+            for g, distribution in trait.items()
+        }
+        self.mutation = float(mutation)
+        self.validate()
+        self._compiled = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a model from a dictionary laid out like `heredity.PROBS`.
+        A trait distribution may also be given as a single number,
+        the probability of showing the trait.
+        """
+        trait = dict()
+        for g, distribution in data["trait"].items():
+            if isinstance(distribution, dict):
+                trait[g] = distribution
+            else:
+                trait[g] = {True: distribution, False: 1 - distribution}
+        return cls(data["gene"], trait, data["mutation"])
+
+    @classmethod
+    def from_json(cls, filename):
+        """
+        Load a model from a JSON file, e.g.
+            {"gene": {"2": 0.01, "1": 0.03, "0": 0.96},
+             "trait": {"2": 0.65, "1": 0.56, "0": 0.01},
+             "mutation": 0.01}
+        """
+        with open(filename) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        """
+        Return the model as a dictionary laid out like `heredity.PROBS`.
+        """
+        return {
+            "gene": dict(self.gene),
+            "trait": {g: dict(self.trait[g]) for g in self.trait},
+            "mutation": self.mutation
+        }
+
+    def validate(self):
+        """
+        Raise ValueError if the model is not a valid set of distributions.
+        """
+        if set(self.gene) != {0, 1, 2}:
+            raise ValueError("gene distribution must cover 0, 1 and 2 copies")
+        if set(self.trait) != {0, 1, 2}:
+            raise ValueError("trait distribution must cover 0, 1 and 2 copies")
+        if not 0 <= self.mutation <= 1:
+            raise ValueError("mutation must be a probability")
+        distributions = [self.gene] + [self.trait[g] for g in self.trait]
+        for distribution in distributions:
+            if any(p < 0 for p in distribution.values()):
+                raise ValueError("probabilities must not be negative")
+            if abs(sum(distribution.values()) - 1) > 1e-9:
+                raise ValueError("probabilities must sum to 1")
+        for g in self.trait:
+            if set(self.trait[g]) != {True, False}:
+                raise ValueError("trait distribution must cover True and False")
+
+    def parameters(self):
+        """
+        Return the model's parameters as a hashable tuple.
+        """
+        return (
+            tuple(sorted(self.gene.items())),
+            tuple(
+                (g, tuple(sorted(self.trait[g].items())))
+                for g in sorted(self.trait)
+            ),
+            self.mutation
+        )
+
+    def compile(self):
+        """
+        Return the conditional probability tables for this model.
+        Tables are reused on later calls while `gene`, `trait` and
+        `mutation` are unchanged, and rebuilt once any of them changes.
+        """
+        parameters = self.parameters()
+        if self._compiled is None or self._compiled[0] != parameters:
+            self.validate()
+            self._compiled = (parameters, CompiledModel(self))
+        return self._compiled[1]
+
+
+class CompiledModel():
+    """
+    Conditional probability tables derived from a `HeredityModel`.
+
+    Genes are indexed 0, 1, 2 and traits False, True, so that
+        - `prior[g]` is P(g) for a person without known parents
+        - `inherit[m][f][g]` is P(g | mother has m, father has f)
+        - `penetrance[g][t]` is P(trait == t | g)
+    """
+
+    def __init__(self, model):
+        self.prior = [model.gene[g] for g in range(3)]
+        self.penetrance = [
+            [model.trait[g][False], model.trait[g][True]] for g in range(3)
+        ]
+
+        # Probability that a parent with g copies passes the gene on:
+        # the parent picks one of its two copies at random, and whatever
+        # is picked flips with probability `mutation`
+        mutation = model.mutation
+        passes = [
+            (g / 2) * (1 - mutation) + (1 - g / 2) * mutation
+            for g in range(3)
+        ]
+        self.inherit = [
+            [
+                [
+                    (1 - passes[m]) * (1 - passes[f]),
+                    passes[m] * (1 - passes[f]) + (1 - passes[m]) * passes[f],
+                    passes[m] * passes[f]
+                ]
+                for f in range(3)
+            ]
+            for m in range(3)
+        ]
+
+    def joint_probability(self, people, one_gene, two_genes, have_trait):
+        """
+        Same as `heredity.joint_probability`, but looked up in the tables.
+        """
+        def genes(person):
+            if person in two_genes:
+                return 2
+            if person in one_gene:
+                return 1
+            return 0
+
+        p = 1
+        for person in people:
+            g = genes(person)
+            mother = people[person]["mother"]
+            father = people[person]["father"]
+            if mother is None and father is None:
+                p *= self.prior[g]
+            else:
+                p *= self.inherit[genes(mother)][genes(father)][g]
+            p *= self.penetrance[g][person in have_trait]
+        return p
+
+    def infer(self, pedigree):
+        """
+        Return gene and trait distributions for everyone in `pedigree`,
+        in the same layout as `heredity.main` builds, normalized.
+
+        `pedigree` may be a `Pedigree` or the dictionary returned by
+        `heredity.load_data`. Traits are summed out analytically, so only
+        the 3^n gene assignments are enumerated.
+        """
+        if not isinstance(pedigree, Pedigree):
+            pedigree = Pedigree(pedigree)
+        n = len(pedigree.names)
+
+        # Per-person factor for each gene count (and parents' gene counts),
+        # with observed traits folded in
+        weights = []
+        for i in range(n):
+            evidence = pedigree.evidence[i]
+            weights.append([
+                1 if evidence is None else self.penetrance[g][evidence]
+                for g in range(3)
+            ])
+        factors = []
+        for i in pedigree.order:
+            mother, father = pedigree.parents[i]
+            if mother is None:
+                factors.append([self.prior[g] * weights[i][g]
+                                for g in range(3)])
+            else:
+                factors.append([
+                    [
+                        [self.inherit[m][f][g] * weights[i][g]
+                         for g in range(3)]
+                        for f in range(3)
+                    ]
+                    for m in range(3)
+                ])
+
+        gene = [[0, 0, 0] for _ in range(n)]
+        assignment = [0] * n
+
+        def enumerate_genes(k, p):
+            if k == n:
+                for i in range(n):
+                    gene[i][assignment[i]] += p
+                return
+            i = pedigree.order[k]
+            mother, father = pedigree.parents[i]
+            if mother is None:
+                row = factors[k]
+            else:
+                row = factors[k][assignment[mother]][assignment[father]]
+            for g in range(3):
+                if row[g]:
+                    assignment[i] = g
+                    enumerate_genes(k + 1, p * row[g])
+
+        enumerate_genes(0, 1)
+
+        probabilities = dict()
+        for i, name in enumerate(pedigree.names):
+            total = sum(gene[i])
+            if total == 0:
+                raise ValueError("evidence has zero probability under model")
+            distribution = [p / total for p in gene[i]]
+            evidence = pedigree.evidence[i]
+            if evidence is None:
+                has_trait = sum(
+                    distribution[g] * self.penetrance[g][True]
+                    for g in range(3)
+                )
+            else:
+                has_trait = 1 if evidence else 0
+            probabilities[name] = {
+                "gene": {2: distribution[2], 1: distribution[1],
+                         0: distribution[0]},
+                "trait": {True: has_trait, False: 1 - has_trait}
+            }
+        return probabilities
+
+
+class Pedigree():
+    """
+    Family structure from `heredity.load_data`, indexed once so that it can
+    be evaluated under many models.
+
+    `order` lists people so that parents always come before their children.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+        index = {name: i for i, name in enumerate(self.names)}
+        self.parents = []
+        self.evidence = []
+        for name in self.names:
+            mother = people[name]["mother"]
+            father = people[name]["father"]
+            if (mother is None) != (father is None):
+                raise ValueError(f"{name} must have both parents or neither")
+            if mother is None:
+                self.parents.append((None, None))
+            else:
+                self.parents.append((index[mother], index[father]))
+            self.evidence.append(people[name]["trait"])
+
+        # Topological order, parents first
+        self.order = []
+        placed = set()
+        while len(self.order) < len(self.names):
+            progress = False
+            for i in range(len(self.names)):
+                if i in placed:
+                    continue
+                if all(p is None or p in placed for p in self.parents[i]):
+                    self.order.append(i)
+                    placed.add(i)
+                    progress = True
+            if not progress:
+                raise ValueError("pedigree contains a cycle")
+
+
+def sweep(people, models):
+    """
+    Run inference for `people` under each model in `models`.
+    The pedigree is indexed once and each model's tables are compiled once.
+    Return a list of (model, probabilities) pairs.
+    """
+    pedigree = Pedigree(people)
+    return [(model, model.compile().infer(pedigree)) for model in models]
+
+
+def parse_bool(value):
+    """
+    Accept True/False as booleans, or as strings from JSON.
+    """
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("true", "1"):
+        return True
+    if str(value).lower() in ("false", "0"):
+        return False
+    raise ValueError(f"invalid trait value {value}")
@@ -0,0 +1,90 @@
+import json
+import sys
+import time
+
+from logic import *
+import bdd
+import compiled
+import parallel
+import sat
+from generate import generate_puzzle
+
+# Inhabitants in each benchmarked puzzle; each adds two symbols
+SIZES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 32]
+
+# Statements per inhabitant
+STATEMENTS = 1
+
+# Largest number of symbols each enumerating backend is run on
+LIMITS = {
+    "truth_table": 14,
+    "circuit": 14,
+    "compiled": 20,
+    "parallel": 20
+}
+
+# Entailment backends to compare, by name
+BACKENDS = {
+    "truth_table": model_check,
+    "circuit": circuit_check,
+    "compiled": compiled.model_check,
+    "parallel": parallel.model_check,
+    "sat": sat.model_check,
+    "bdd": bdd.model_check
+}
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [results.json]")
+    results = run_benchmark(SIZES)
+    for result in results:
+        timings = ", ".join(
+            f"{backend}: {seconds:.4f}s"
+            for backend, seconds in result["seconds"].items()
+        )
+        status = "ok" if result["agree"] else "MISMATCH"
+        print(f"{result['symbols']:3} symbols  {timings}  [{status}]")
+    if len(sys.argv) == 2:
+        with open(sys.argv[1], "w") as f:
+            json.dump(results, f, indent=2)
+    if not all(result["agree"] for result in results):
+        sys.exit("Backends disagree")
+
+
+def run_benchmark(sizes, seed=0):
+    """
+    Generate a puzzle for each number of inhabitants in `sizes` and time
+    how long each backend takes to decide, for every symbol, whether the
+    puzzle entails it. Return one result dictionary per puzzle.
+    """
+    results = []
+    for size in sizes:
+        knowledge, symbols, solution = generate_puzzle(
+            size, size * STATEMENTS, seed=seed + size
+        )
+        seconds = dict()
+        answers = dict()
+        for name, backend in BACKENDS.items():
+            if len(symbols) > LIMITS.get(name, len(symbols)):
+                continue
+            start = time.perf_counter()
+            answers[name] = [
+                symbol.name for symbol in symbols
+                if backend(knowledge, symbol)
+            ]
+            seconds[name] = time.perf_counter() - start
+        entailed = list(answers.values())
+        results.append({
+            "inhabitants": size,
+            "statements": size * STATEMENTS,
+            "symbols": len(symbols),
+            "seconds": seconds,
+            "entailed": entailed[0],
+            "agree": all(answer == entailed[0] for answer in entailed)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    main()
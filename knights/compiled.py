@@ -0,0 +1,136 @@
+from logic import *
+
+# Number of models evaluated at once; each model is one bit of a word
+WORD = 64
+FULL = (1 << WORD) - 1
+
+# The first LOW symbols vary inside a word, the rest vary between words
+LOW = WORD.bit_length() - 1
+MASKS = [
+    sum(1 << k for k in range(WORD) if (k >> i) & 1)
+    for i in range(LOW)
+]
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles `sentence` into a function of one argument, a list with a word
+    per symbol in `symbols` (bit k of word i is the value of symbols[i] in
+    model k). The function returns a word whose bit k is the value of
+    `sentence` in model k.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    lines = []
+    names = dict()
+
+    def emit(sentence):
+        """Returns the name of a local holding the value of `sentence`."""
+        key = id(sentence)
+        if key in names:
+            return names[key][0]
+        if isinstance(sentence, Symbol):
+            if sentence.name not in index:
+                raise Exception(f"variable {sentence.name} not in model")
+            expression = f"v[{index[sentence.name]}]"
+        elif isinstance(sentence, Constant):
+            expression = "F" if sentence.value else "0"
+        elif isinstance(sentence, Not):
+            expression = f"{emit(sentence.operand)} ^ F"
+        elif isinstance(sentence, And):
+            operands = [emit(c) for c in sentence.conjuncts]
+            expression = " & ".join(operands) if operands else "F"
+        elif isinstance(sentence, Or):
+            operands = [emit(d) for d in sentence.disjuncts]
+            expression = " | ".join(operands) if operands else "0"
+        elif isinstance(sentence, Implication):
+            antecedent = emit(sentence.antecedent)
+            consequent = emit(sentence.consequent)
+            expression = f"({antecedent} ^ F) | {consequent}"
+        elif isinstance(sentence, Biconditional):
+            left = emit(sentence.left)
+            right = emit(sentence.right)
+            expression = f"{left} ^ {right} ^ F"
+        else:
+            raise TypeError(f"cannot compile {sentence}")
+        name = f"t{len(lines)}"
+        lines.append(f"    {name} = {expression}")
+
+        # Keep the sentence alive so that its id is not reused
+        names[key] = (name, sentence)
+        return name
+
+    result = emit(sentence)
+    source = "def evaluate(v):\n" + "\n".join(lines) + f"\n    return {result}\n"
+    namespace = {"F": FULL}
+    exec(source, namespace)
+    return namespace["evaluate"]
+
+
+def blocks(count):
+    """
+    Yields (words, valid) for every block of models over `count` symbols,
+    where `words` is the argument for a compiled sentence and `valid`
+    masks off bits that do not correspond to a model.
+    """
+    low = min(count, LOW)
+    valid = (1 << (1 << low)) - 1
+    words = MASKS[:low] + [0] * (count - low)
+    for block in range(1 << (count - low)):
+        for i in range(low, count):
+            words[i] = FULL if (block >> (i - low)) & 1 else 0
+        yield words, valid
+
+
+def models(sentence, symbols=None):
+    """
+    Yields every model of `symbols` (defaults to the symbols of `sentence`)
+    in which `sentence` is true, as an integer whose bit i is the value of
+    symbols[i].
+    """
+    if symbols is None:
+        symbols = sorted(sentence.symbols())
+    evaluate = compile_sentence(sentence, symbols)
+    low = min(len(symbols), LOW)
+    for block, (words, valid) in enumerate(blocks(len(symbols))):
+        word = evaluate(words) & valid
+        while word:
+            k = (word & -word).bit_length() - 1
+            yield (block << low) | k
+            word &= word - 1
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, evaluating a word of models
+    at a time. Drop-in replacement for `logic.model_check`.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    evaluate = compile_sentence(And(knowledge, Not(query)), symbols)
+    for words, valid in blocks(len(symbols)):
+        if evaluate(words) & valid:
+            return False
+    return True
+
+
+def filter_models(evaluate, models, count):
+    """
+    Returns the models (integers over `count` symbols, as yielded by
+    `models`) for which the compiled function `evaluate` is true,
+    packing a word of models into each call.
+    """
+    models = list(models)
+    result = []
+    for start in range(0, len(models), WORD):
+        chunk = models[start:start + WORD]
+        words = [0] * count
+        for k, model in enumerate(chunk):
+            bit = 1 << k
+            while model:
+                low = model & -model
+                words[low.bit_length() - 1] |= bit
+                model ^= low
+        word = evaluate(words)
+        result.extend(
+            model for k, model in enumerate(chunk) if (word >> k) & 1
+        )
+    return result
@@ -0,0 +1,268 @@
+from logic import *
+
+
+class Interned():
+    """
+    Mixin for sentences built by an `Interner`.
+
+    Interned sentences are immutable, and their hash and symbols are
+    computed once, from their (already interned) children. Each subclass
+    names the plain sentence class it extends as `base`.
+    """
+    __slots__ = ()
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Sentence) or hash(self) != hash(other):
+            return False
+        return super().__eq__(other)
+
+    def symbols(self):
+        return set(self._symbols)
+
+    def add(self, conjunct):
+        raise Exception("interned sentences cannot be changed")
+
+
+class InternedConstant(Interned, Constant):
+    __slots__ = ("_hash", "_symbols")
+    base = Constant
+
+
+class InternedSymbol(Interned, Symbol):
+    __slots__ = ("_hash", "_symbols")
+    base = Symbol
+
+
+class InternedNot(Interned, Not):
+    __slots__ = ("_hash", "_symbols")
+    base = Not
+
+
+class InternedAnd(Interned, And):
+    __slots__ = ("_hash", "_symbols")
+    base = And
+
+
+class InternedOr(Interned, Or):
+    __slots__ = ("_hash", "_symbols")
+    base = Or
+
+
+class InternedImplication(Interned, Implication):
+    __slots__ = ("_hash", "_symbols")
+    base = Implication
+
+
+class InternedBiconditional(Interned, Biconditional):
+    __slots__ = ("_hash", "_symbols")
+    base = Biconditional
+
+
+class Interner():
+    """
+    Builds hash-consed sentences: structurally equal sentences built by
+    the same interner are the same object, so a knowledge base becomes a
+    DAG in which repeated subformulas are stored and evaluated once.
+
+    The node and simplification tables grow with every sentence built and
+    are never pruned, so an interner should live no longer than the
+    knowledge base that owns it.
+    """
+
+    def __init__(self):
+        self.table = dict()
+        self.simplified = dict()
+        self.true = self.constant(True)
+        self.false = self.constant(False)
+
+    def make(self, cls, key, children, *args):
+        """Returns the unique `cls` node for `key`, creating it if needed."""
+        node = self.table.get(key)
+        if node is None:
+            node = cls.__new__(cls)
+            cls.base.__init__(node, *args)
+            if isinstance(node, And):
+                node.conjuncts = tuple(node.conjuncts)
+            elif isinstance(node, Or):
+                node.disjuncts = tuple(node.disjuncts)
+            if isinstance(node, Symbol):
+                node._symbols = frozenset([node.name])
+            else:
+                node._symbols = frozenset().union(
+                    *[child._symbols for child in children]
+                )
+            node._hash = cls.base.__hash__(node)
+            self.table[key] = node
+        return node
+
+    def constant(self, value):
+        return self.make(InternedConstant, ("constant", bool(value)), [], value)
+
+    def symbol(self, name):
+        return self.make(InternedSymbol, ("symbol", name), [], name)
+
+    def negation(self, operand):
+        return self.make(
+            InternedNot, ("not", id(operand)), [operand], operand
+        )
+
+    def conjunction(self, *conjuncts):
+        return self.make(
+            InternedAnd, ("and",) + tuple(id(c) for c in conjuncts),
+            conjuncts, *conjuncts
+        )
+
+    def disjunction(self, *disjuncts):
+        return self.make(
+            InternedOr, ("or",) + tuple(id(d) for d in disjuncts),
+            disjuncts, *disjuncts
+        )
+
+    def implication(self, antecedent, consequent):
+        return self.make(
+            InternedImplication,
+            ("implies", id(antecedent), id(consequent)),
+            [antecedent, consequent], antecedent, consequent
+        )
+
+    def biconditional(self, left, right):
+        return self.make(
+            InternedBiconditional, ("biconditional", id(left), id(right)),
+            [left, right], left, right
+        )
+
+    def intern(self, sentence):
+        """Returns the interned copy of any sentence."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, Interned) and (
+            self.table.get(self.key(sentence)) is sentence
+        ):
+            return sentence
+        if isinstance(sentence, Constant):
+            return self.constant(sentence.value)
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return self.negation(self.intern(sentence.operand))
+        if isinstance(sentence, And):
+            return self.conjunction(
+                *[self.intern(c) for c in sentence.conjuncts]
+            )
+        if isinstance(sentence, Or):
+            return self.disjunction(
+                *[self.intern(d) for d in sentence.disjuncts]
+            )
+        if isinstance(sentence, Implication):
+            return self.implication(
+                self.intern(sentence.antecedent),
+                self.intern(sentence.consequent)
+            )
+        if isinstance(sentence, Biconditional):
+            return self.biconditional(
+                self.intern(sentence.left), self.intern(sentence.right)
+            )
+        raise TypeError(f"cannot intern {sentence}")
+
+    def key(self, node):
+        """Returns the table key of an interned node."""
+        if isinstance(node, Constant):
+            return ("constant", node.value)
+        if isinstance(node, Symbol):
+            return ("symbol", node.name)
+        if isinstance(node, Not):
+            return ("not", id(node.operand))
+        if isinstance(node, And):
+            return ("and",) + tuple(id(c) for c in node.conjuncts)
+        if isinstance(node, Or):
+            return ("or",) + tuple(id(d) for d in node.disjuncts)
+        if isinstance(node, Implication):
+            return ("implies", id(node.antecedent), id(node.consequent))
+        return ("biconditional", id(node.left), id(node.right))
+
+    def simplify(self, sentence):
+        """
+        Returns an interned sentence equivalent to `sentence`, after
+        constant folding, removing double negations, flattening nested
+        And/Or and removing duplicate conjuncts and disjuncts.
+        """
+        node = self.intern(sentence)
+        if node in self.simplified:
+            return self.simplified[node]
+        result = self.simplify_node(node)
+        self.simplified[node] = result
+        self.simplified[result] = result
+        return result
+
+    def simplify_node(self, node):
+        if isinstance(node, (Constant, Symbol)):
+            return node
+
+        if isinstance(node, Not):
+            operand = self.simplify(node.operand)
+            if isinstance(operand, Constant):
+                return self.constant(not operand.value)
+            if isinstance(operand, Not):
+                return operand.operand
+            return self.negation(operand)
+
+        if isinstance(node, (And, Or)):
+            conjunction = isinstance(node, And)
+            children = node.conjuncts if conjunction else node.disjuncts
+            identity = self.true if conjunction else self.false
+            absorbing = self.false if conjunction else self.true
+            flat = dict()
+            stack = [self.simplify(child) for child in reversed(children)]
+            while stack:
+                child = stack.pop()
+                if child is identity:
+                    continue
+                if child is absorbing:
+                    return absorbing
+                if isinstance(child, And if conjunction else Or):
+                    nested = child.conjuncts if conjunction else child.disjuncts
+                    stack.extend(reversed(nested))
+                    continue
+                flat[child] = True
+
+            # A literal next to its own negation decides the result
+            for child in flat:
+                if isinstance(child, Not) and child.operand in flat:
+                    return absorbing
+            if not flat:
+                return identity
+            if len(flat) == 1:
+                return next(iter(flat))
+            if conjunction:
+                return self.conjunction(*flat)
+            return self.disjunction(*flat)
+
+        if isinstance(node, Implication):
+            antecedent = self.simplify(node.antecedent)
+            consequent = self.simplify(node.consequent)
+            if (antecedent is self.false or consequent is self.true
+                    or antecedent is consequent):
+                return self.true
+            if antecedent is self.true:
+                return consequent
+            if consequent is self.false:
+                return self.simplify(self.negation(antecedent))
+            return self.implication(antecedent, consequent)
+
+        left = self.simplify(node.left)
+        right = self.simplify(node.right)
+        if left is right:
+            return self.true
+        if self.simplify(self.negation(left)) is right:
+            return self.false
+        for a, b in ((left, right), (right, left)):
+            if a is self.true:
+                return b
+            if a is self.false:
+                return self.simplify(self.negation(b))
+        return self.biconditional(left, right)
+
@@ -0,0 +1,98 @@
+import random
+import sys
+
+from logic import *
+import sat
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python generate.py inhabitants statements [seed]")
+    inhabitants = int(sys.argv[1])
+    statements = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    knowledge, symbols, _ = generate_puzzle(inhabitants, statements, seed)
+
+    print("Statements")
+    for sentence in knowledge.conjuncts[2 * inhabitants:]:
+        print(f"    {sentence.formula()}")
+    print("Solution")
+    for symbol in symbols:
+        if sat.model_check(knowledge, symbol):
+            print(f"    {symbol}")
+
+
+def inhabitant(i):
+    """Returns the name of the i-th inhabitant: A, B, ..., Z, A1, B1, ..."""
+    letter = chr(ord("A") + i % 26)
+    return letter if i < 26 else f"{letter}{i // 26}"
+
+
+def generate_puzzle(inhabitants, statements, seed=None):
+    """
+    Returns a random knights and knaves puzzle as (knowledge, symbols, solution).
+
+    Each of the `inhabitants` is a knight or a knave, and `statements`
+    times one of them says something about the others. Statements are
+    chosen to be consistent with a hidden `solution` (a dictionary from
+    symbol name to bool), so the knowledge base is always satisfiable.
+    """
+    rng = random.Random(seed)
+    names = [inhabitant(i) for i in range(inhabitants)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+    kinds = [rng.random() < 0.5 for _ in names]
+    solution = dict()
+    for i in range(inhabitants):
+        solution[knights[i].name] = kinds[i]
+        solution[knaves[i].name] = not kinds[i]
+
+    knowledge = And()
+
+    # GROUND RULES
+    for i in range(inhabitants):
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Not(And(knights[i], knaves[i])))
+
+    # TRANSLATION
+    for _ in range(statements):
+        speaker = rng.randrange(inhabitants)
+        claim = random_claim(rng, knights, knaves, depth=2)
+
+        # A knight's claim is true and a knave's claim is false, so flip
+        # the claim if the hidden solution disagrees with it
+        if claim.evaluate(solution) != kinds[speaker]:
+            claim = Not(claim)
+        knowledge.add(Biconditional(knights[speaker], claim))
+
+    return knowledge, knights + knaves, solution
+
+
+def random_claim(rng, knights, knaves, depth):
+    """Returns a random claim one inhabitant could make about others."""
+    i = rng.randrange(len(knights))
+    j = rng.randrange(len(knights))
+    kind = rng.randrange(6 if depth > 0 else 5)
+    if kind == 0:
+        # "i is a knight."
+        return knights[i]
+    if kind == 1:
+        # "i is a knave."
+        return knaves[i]
+    if kind == 2:
+        # "i and j are the same kind."
+        return Biconditional(knights[i], knights[j])
+    if kind == 3:
+        # "i and j are both knaves."
+        return And(knaves[i], knaves[j])
+    if kind == 4:
+        # "At least one of i and j is a knight."
+        return Or(knights[i], knights[j])
+    # "i says <claim>."
+    return Biconditional(
+        knights[i], random_claim(rng, knights, knaves, depth - 1)
+    )
+
+
+if __name__ == "__main__":
+    main()
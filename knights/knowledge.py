@@ -0,0 +1,98 @@
+from logic import *
+from compiled import compile_sentence, filter_models, models
+from dag import Interner
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that enumerates its satisfying models once and answers
+    entailment queries against that cached set.
+
+    Models are integers whose bit i is the value of the symbol `names[i]`.
+    Sentences are interned and simplified before they are compiled.
+    """
+
+    def __init__(self, *sentences):
+        for sentence in sentences:
+            Sentence.validate(sentence)
+        self.sentences = list(sentences)
+        self.names = sorted(set().union(
+            *[sentence.symbols() for sentence in sentences]
+        ))
+        self.interner = Interner()
+        if sentences:
+            knowledge = self.interner.simplify(And(*sentences))
+            self.models = list(models(knowledge, self.names))
+        else:
+            self.models = [0]
+
+    @property
+    def knowledge(self):
+        """Returns the knowledge base as a single sentence."""
+        return And(*self.sentences)
+
+    def symbols(self):
+        """Returns a set of all symbols in the knowledge base."""
+        return set(self.names)
+
+    def add(self, sentence):
+        """
+        Adds `sentence`, keeping only the cached models it is true in.
+        New symbols extend every model with each of their assignments.
+        """
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.extend(sentence.symbols())
+        evaluate = compile_sentence(
+            self.interner.simplify(sentence), self.names
+        )
+        self.models = filter_models(evaluate, self.models, len(self.names))
+
+    def extend(self, symbols):
+        """Adds unconstrained `symbols` to the knowledge base."""
+        new = sorted(set(symbols) - set(self.names))
+        if not new:
+            return
+        self.models = list(self.extended_models(new))
+        self.names.extend(new)
+
+    def extended_models(self, new):
+        """Yields every cached model combined with every assignment of `new`."""
+        shift = len(self.names)
+        for extension in range(1 << len(new)):
+            for model in self.models:
+                yield model | (extension << shift)
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+        Sentence.validate(query)
+        new = sorted(query.symbols() - set(self.names))
+        names = self.names + new
+        evaluate = compile_sentence(
+            self.interner.simplify(Not(query)), names
+        )
+        candidates = self.extended_models(new) if new else self.models
+        return not filter_models(evaluate, candidates, len(names))
+
+    def entailed_symbols(self):
+        """
+        Returns the set of every symbol that is true in all models of the
+        knowledge base, in a single pass over the cached models.
+        """
+        true = (1 << len(self.names)) - 1
+        for model in self.models:
+            true &= model
+            if not true:
+                break
+        return set(
+            Symbol(name) for i, name in enumerate(self.names)
+            if (true >> i) & 1
+        )
+
+    def model_dicts(self):
+        """Yields each cached model as a dictionary from symbol to bool."""
+        for model in self.models:
+            yield {
+                name: bool((model >> i) & 1)
+                for i, name in enumerate(self.names)
+            }
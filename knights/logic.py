@@ -2,6 +2,7 @@ import itertools
 
 
 class Sentence():
+    __slots__ = ()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -43,6 +44,7 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
         self.name = name
@@ -69,7 +71,34 @@ class Symbol(Sentence):
         return {self.name}
 
 
+class Constant(Sentence):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = bool(value)
+
+    def __eq__(self, other):
+        return isinstance(other, Constant) and self.value == other.value
+
+    def __hash__(self):
+        return hash(("constant", self.value))
+
+    def __repr__(self):
+        return f"Constant({self.value})"
+
+    def evaluate(self, model):
+        return self.value
+
+    def formula(self):
+        return str(self.value)
+
+    def symbols(self):
+        return set()
+
+
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
@@ -94,13 +123,16 @@ class Not(Sentence):
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return (isinstance(other, And)
+                and list(self.conjuncts) == list(other.conjuncts))
 
     def __hash__(self):
         return hash(
@@ -131,13 +163,16 @@ class And(Sentence):
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return (isinstance(other, Or)
+                and list(self.disjuncts) == list(other.disjuncts))
 
     def __hash__(self):
         return hash(
@@ -162,6 +197,8 @@ class Or(Sentence):
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
@@ -193,6 +230,8 @@ class Implication(Sentence):
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
@@ -225,39 +264,228 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+class Circuit():
+    """
+    Sentences flattened into gates, indexed so that children come before
+    their parents. Flipping a symbol re-evaluates only the gates whose
+    value depends on it, and stops wherever a value does not change.
+    """
+
+    SYMBOL, CONSTANT, NOT, AND, OR, IMPLIES, IFF = range(7)
+
+    def __init__(self, sentences, symbols):
+        """Builds gates for `sentences`, with every symbol false."""
+        self.kinds = []
+        self.children = []
+        self.parents = []
+        self.values = []
+        self.counts = []
+        self.levels = []
+        self.inputs = [None] * len(symbols)
+        index = {name: i for i, name in enumerate(symbols)}
+        gates = dict()
+
+        # Post-order walk, so that a gate is added after its children
+        stack = [(sentence, False) for sentence in reversed(sentences)]
+        while stack:
+            sentence, expanded = stack.pop()
+            if id(sentence) in gates:
+                continue
+            operands = Circuit.operands(sentence)
+            if not expanded and operands:
+                stack.append((sentence, True))
+                stack.extend((child, False) for child in reversed(operands))
+                continue
+            gate = len(self.kinds)
+            if isinstance(sentence, Symbol):
+                if sentence.name not in index:
+                    raise Exception(f"variable {sentence.name} not in model")
+
+                # Equal symbols from different objects share one gate
+                if self.inputs[index[sentence.name]] is not None:
+                    gate = self.inputs[index[sentence.name]]
+                    gates[id(sentence)] = (gate, sentence)
+                    continue
+                self.inputs[index[sentence.name]] = gate
+            gates[id(sentence)] = (gate, sentence)
+            children = [gates[id(child)][0] for child in operands]
+            for child in children:
+                self.parents[child].append(gate)
+            self.kinds.append(Circuit.kind(sentence))
+            self.children.append(children)
+            self.levels.append(
+                1 + max(self.levels[child] for child in children)
+                if children else 0
+            )
+            self.parents.append([])
+
+            # And/Or keep a count of children that are false/true,
+            # so that a flipped child updates them in O(1)
+            values = [self.values[child] for child in children]
+            if isinstance(sentence, And):
+                self.counts.append(values.count(False))
+            elif isinstance(sentence, Or):
+                self.counts.append(values.count(True))
+            else:
+                self.counts.append(0)
+            if isinstance(sentence, Symbol):
+                self.values.append(False)
+            elif isinstance(sentence, Constant):
+                self.values.append(sentence.value)
+            else:
+                self.values.append(None)
+                self.values[gate] = self.compute(gate)
+        self.roots = [gates[id(sentence)][0] for sentence in sentences]
+
+        # Gates waiting to be settled during a flip, by level, and the
+        # flip each gate was last queued in
+        self.buckets = [[] for _ in range(max(self.levels, default=0) + 1)]
+        self.stamps = [0] * len(self.kinds)
+        self.generation = 0
 
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    @classmethod
+    def operands(cls, sentence):
+        if isinstance(sentence, Not):
+            return [sentence.operand]
+        if isinstance(sentence, And):
+            return list(sentence.conjuncts)
+        if isinstance(sentence, Or):
+            return list(sentence.disjuncts)
+        if isinstance(sentence, Implication):
+            return [sentence.antecedent, sentence.consequent]
+        if isinstance(sentence, Biconditional):
+            return [sentence.left, sentence.right]
+        return []
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    @classmethod
+    def kind(cls, sentence):
+        for sentence_type, kind in [
+            (Symbol, Circuit.SYMBOL), (Constant, Circuit.CONSTANT),
+            (Not, Circuit.NOT), (And, Circuit.AND), (Or, Circuit.OR),
+            (Implication, Circuit.IMPLIES), (Biconditional, Circuit.IFF)
+        ]:
+            if isinstance(sentence, sentence_type):
+                return kind
+        raise TypeError(f"cannot evaluate {sentence}")
+
+    def compute(self, gate):
+        """Returns the value of a gate from its children and counts."""
+        kind = self.kinds[gate]
+        children = self.children[gate]
+        if kind == Circuit.AND:
+            return self.counts[gate] == 0
+        if kind == Circuit.OR:
+            return self.counts[gate] > 0
+        if kind == Circuit.NOT:
+            return not self.values[children[0]]
+        if kind == Circuit.IMPLIES:
+            return (not self.values[children[0]]) or self.values[children[1]]
+        if kind == Circuit.IFF:
+            return self.values[children[0]] == self.values[children[1]]
+        return self.values[gate]
+
+    def flip(self, symbol):
+        """Flips the `symbol`-th symbol and updates every affected gate."""
+        start = self.inputs[symbol]
+        if start is None:
+            return
+        values = self.values
+        counts = self.counts
+        kinds = self.kinds
+        children = self.children
+        parents = self.parents
+        levels = self.levels
+        buckets = self.buckets
+        stamps = self.stamps
+        AND, OR, NOT, IMPLIES = (
+            Circuit.AND, Circuit.OR, Circuit.NOT, Circuit.IMPLIES
+        )
+        self.generation += 1
+        generation = self.generation
+        values[start] = not values[start]
+
+        # Settle gates level by level, so each changes at most once; a gate
+        # is queued once per flip, when its stamp is not this generation
+        buckets[levels[start]].append(start)
+        pending = 1
+        level = levels[start]
+        while pending:
+            bucket = buckets[level]
+            pending -= len(bucket)
+            for gate in bucket:
+                if gate != start:
+                    kind = kinds[gate]
+                    if kind == AND:
+                        value = counts[gate] == 0
+                    elif kind == OR:
+                        value = counts[gate] > 0
+                    elif kind == NOT:
+                        value = not values[children[gate][0]]
+                    elif kind == IMPLIES:
+                        a, b = children[gate]
+                        value = (not values[a]) or values[b]
+                    else:
+                        a, b = children[gate]
+                        value = values[a] == values[b]
+                    if value == values[gate]:
+                        continue
+                    values[gate] = value
+                value = values[gate]
+                for parent in parents[gate]:
+                    kind = kinds[parent]
+                    if kind == AND:
+                        counts[parent] += -1 if value else 1
+                    elif kind == OR:
+                        counts[parent] += 1 if value else -1
+                    if stamps[parent] != generation:
+                        stamps[parent] = generation
+                        buckets[levels[parent]].append(parent)
+                        pending += 1
+            bucket.clear()
+            level += 1
+
+
+def model_check(knowledge, query, backend=None):
+    """Checks if knowledge base entails query.
+
+    `backend` is an optional function with the same signature, such as
+    `sat.model_check` or `circuit_check`, that is used instead of
+    evaluating every model.
+    """
+    if backend is not None:
+        return backend(knowledge, query)
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    model = dict.fromkeys(symbols, False)
+
+    # Walk every model in Gray-code order, flipping one symbol per step
+    for step in range(1 << len(symbols)):
+        if step:
+            p = symbols[(step & -step).bit_length() - 1]
+            model[p] = not model[p]
+
+        # If knowledge base is true in model, then query must also be true
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
+
+def circuit_check(knowledge, query):
+    """Checks if knowledge base entails query, updating a `Circuit`.
+
+    Models are walked in the same Gray-code order as `model_check`, but
+    each step only re-evaluates the gates that depend on the flipped
+    symbol. That pays off when many gates depend on few symbols;
+    `model_check` short-circuits instead and is usually as fast.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    circuit = Circuit([knowledge, query], symbols)
+    kb, q = circuit.roots
+    values = circuit.values
+    for step in range(1 << len(symbols)):
+        if step:
+            circuit.flip((step & -step).bit_length() - 1)
+        if values[kb] and not values[q]:
+            return False
+    return True
@@ -0,0 +1,100 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from logic import *
+from compiled import FULL, blocks, compile_sentence
+from generate import generate_puzzle
+
+# Partitions per process, so that idle workers can pick up more work
+CHUNKS = 4
+
+# Inhabitants in the puzzles used by the benchmark
+SIZES = [6, 8, 10, 11]
+
+# Counter-model check and partition layout, set in each worker
+worker = dict()
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(size) for size in sys.argv[1:]]
+    else:
+        sizes = SIZES
+    cores = [1]
+    while cores[-1] * 2 <= os.cpu_count():
+        cores.append(cores[-1] * 2)
+
+    for size in sizes:
+        knowledge, symbols, _ = generate_puzzle(size, size, seed=size)
+
+        # Always entailed, so every model has to be checked
+        query = Or(symbols[0], symbols[size])
+        baseline = None
+        for processes in cores:
+            start = time.perf_counter()
+            model_check(knowledge, query, processes=processes)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{2 * size} symbols, {processes} processes: "
+                  f"{elapsed:.3f}s (speedup {baseline / elapsed:.2f})")
+
+
+def model_check(knowledge, query, processes=None, split=None):
+    """
+    Checks if knowledge base entails query, by fixing the first `split`
+    symbols in each of the 2^split ways and checking those partitions of
+    the model space in a pool of `processes` worker processes.
+    Stops every worker as soon as one of them finds a counter-model.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if processes is None:
+        processes = os.cpu_count()
+    if split is None:
+        split = math.ceil(math.log2(processes * CHUNKS)) if processes > 1 else 0
+    split = min(split, len(symbols))
+    args = (knowledge, query, symbols, split)
+
+    # A single process does not need a pool
+    if processes == 1:
+        initialize(*args)
+        return all(check_partition(p) for p in range(1 << split))
+
+    with multiprocessing.Pool(processes, initialize, args) as pool:
+        for entailed in pool.imap_unordered(check_partition, range(1 << split)):
+            if not entailed:
+                pool.terminate()
+                return False
+    return True
+
+
+def initialize(knowledge, query, symbols, split):
+    """Compiles the counter-model check once per worker process."""
+    fixed = symbols[:split]
+    free = symbols[split:]
+    worker["evaluate"] = compile_sentence(
+        And(knowledge, Not(query)), free + fixed
+    )
+    worker["free"] = len(free)
+    worker["fixed"] = len(fixed)
+
+
+def check_partition(partition):
+    """
+    Checks every model whose fixed symbols are given by the bits of
+    `partition`. Returns False if one of them is a counter-model.
+    """
+    evaluate = worker["evaluate"]
+    fixed = [
+        FULL if (partition >> i) & 1 else 0 for i in range(worker["fixed"])
+    ]
+    for words, valid in blocks(worker["free"]):
+        if evaluate(words + fixed) & valid:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+from logic import *
+
+
+class CNF():
+    """
+    Conjunctive normal form built with the Tseitin transformation.
+
+    Variables are positive integers and a literal is a variable or its
+    negation. Every subformula gets a fresh variable that is constrained
+    to equal it, so the clause count grows linearly with the sentence.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = dict()
+        self.count = 0
+        self.literals = dict()
+        self.true = None
+
+    def variable(self, name):
+        """Returns the variable for symbol `name`, creating it if needed."""
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new variable that stands for no symbol."""
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """Adds clauses requiring `sentence` to be true."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when `sentence` is."""
+        key = id(sentence)
+        if key in self.literals:
+            return self.literals[key][0]
+
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Constant):
+            literal = self.constant(sentence.value)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, And):
+            literal = self.gate_and(
+                [self.literal(c) for c in sentence.conjuncts]
+            )
+        elif isinstance(sentence, Or):
+            literal = self.gate_or(
+                [self.literal(d) for d in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            literal = self.gate_or([
+                -self.literal(sentence.antecedent),
+                self.literal(sentence.consequent)
+            ])
+        elif isinstance(sentence, Biconditional):
+            literal = self.gate_iff(
+                self.literal(sentence.left), self.literal(sentence.right)
+            )
+        else:
+            raise TypeError(f"cannot convert {sentence} to CNF")
+
+        # Keep the sentence alive so that its id is not reused
+        self.literals[key] = (literal, sentence)
+        return literal
+
+    def constant(self, value):
+        """Returns a literal that is always `value`."""
+        if self.true is None:
+            self.true = self.fresh()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def gate_and(self, literals):
+        if not literals:
+            return self.constant(True)
+        if len(literals) == 1:
+            return literals[0]
+        x = self.fresh()
+        for literal in literals:
+            self.clauses.append([-x, literal])
+        self.clauses.append([x] + [-literal for literal in literals])
+        return x
+
+    def gate_or(self, literals):
+        if not literals:
+            return self.constant(False)
+        if len(literals) == 1:
+            return literals[0]
+        x = self.fresh()
+        for literal in literals:
+            self.clauses.append([x, -literal])
+        self.clauses.append([-x] + literals)
+        return x
+
+    def gate_iff(self, a, b):
+        x = self.fresh()
+        self.clauses.append([-x, -a, b])
+        self.clauses.append([-x, a, -b])
+        self.clauses.append([x, a, b])
+        self.clauses.append([x, -a, -b])
+        return x
+
+
+class Solver():
+    """
+    DPLL satisfiability solver with unit propagation over two watched
+    literals per clause and chronological backtracking.
+    """
+
+    def __init__(self, clauses, count):
+        self.count = count
+        self.values = [None] * (count + 1)
+        self.trail = []
+        self.head = 0
+        self.watches = {
+            literal: []
+            for v in range(1, count + 1) for literal in (v, -v)
+        }
+        self.clauses = []
+        self.units = []
+        self.empty = False
+
+        occurrences = {literal: 0 for literal in self.watches}
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.empty = True
+                continue
+            for literal in clause:
+                occurrences[literal] += 1
+            if len(clause) == 1:
+                self.units.append(clause[0])
+                continue
+            self.watches[clause[0]].append(len(self.clauses))
+            self.watches[clause[1]].append(len(self.clauses))
+            self.clauses.append(clause)
+
+        # Decide on the most constrained variables first, trying the
+        # polarity that satisfies the most clauses
+        self.order = sorted(
+            range(1, count + 1),
+            key=lambda v: -(occurrences[v] + occurrences[-v])
+        )
+        self.phase = [False] + [
+            occurrences[v] >= occurrences[-v] for v in range(1, count + 1)
+        ]
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def assign(self, literal):
+        self.values[abs(literal)] = literal > 0
+        self.trail.append(literal)
+
+    def undo(self, size):
+        """Unassigns everything on the trail after its first `size` items."""
+        while len(self.trail) > size:
+            self.values[abs(self.trail.pop())] = None
+        self.head = min(self.head, size)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses.
+        Returns False on a conflict, True otherwise.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            kept = []
+            for n, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the falsified literal in the second slot
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[n + 1:])
+                        self.watches[false] = kept
+                        return False
+                    self.assign(clause[0])
+            self.watches[false] = kept
+        return True
+
+    def solve(self, assumptions=()):
+        """
+        Returns a satisfying assignment as a list indexed by variable,
+        or None if the clauses (plus `assumptions`) are unsatisfiable.
+        """
+        if self.empty:
+            return None
+        self.undo(0)
+        for literal in list(self.units) + list(assumptions):
+            value = self.value(literal)
+            if value is False:
+                return None
+            if value is None:
+                self.assign(literal)
+
+        # Each decision is (trail size before it, literal, already flipped)
+        decisions = []
+        while True:
+            if not self.propagate():
+                while decisions:
+                    size, literal, flipped = decisions.pop()
+                    self.undo(size)
+                    if not flipped:
+                        decisions.append((size, -literal, True))
+                        self.assign(-literal)
+                        break
+                else:
+                    return None
+                continue
+
+            for v in self.order:
+                if self.values[v] is None:
+                    literal = v if self.phase[v] else -v
+                    decisions.append((len(self.trail), literal, False))
+                    self.assign(literal)
+                    break
+            else:
+                return list(self.values)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model (symbol name to bool) in which `sentence` is true,
+    or None if there is no such model.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    for name in sentence.symbols():
+        cnf.variable(name)
+    values = Solver(cnf.clauses, cnf.count).solve()
+    if values is None:
+        return None
+    return {
+        name: bool(values[variable])
+        for name, variable in cnf.variables.items()
+    }
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking that
+    knowledge ∧ ¬query is unsatisfiable.
+    Drop-in replacement for `logic.model_check`.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf.clauses, cnf.count).solve() is None
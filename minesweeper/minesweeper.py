@@ -1,6 +1,10 @@
 import itertools
 import random
-import copy
+
+# Largest number of cells in a group of connected sentences for which every
+# assignment of mines is enumerated; larger groups fall back to subset
+# inference
+MAX_COMPONENT = 24
 
 
 class Minesweeper():
@@ -191,79 +195,180 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
-
-        # coordinates of the cell
-        i = cell[0]
-        j = cell[1]
-        # neighbor cells stored in list
-        neighbors = list()
-        # first neighbor cell
-        neighbor_i = i - 1
-        neighbor_j = j - 1
-
-        # Add the neighboring cells
-        # checks 2 rows and 1 diagonal
-        for k in range(3):
-            # initializes each time a row is changed
-            neighbor_j = j - 1
-            # checks each cell of the row
-            for n in range(3):
-                # check if the cell is out of the edges
-                if neighbor_i > self.height - 1 or neighbor_i < 0 or neighbor_j > self.width - 1 or neighbor_j < 0:
-                    neighbor_j = neighbor_j + 1
-
-                # if the cell is in the board, check if its in made moves
-                else:
-                    if (neighbor_i, neighbor_j) in self.moves_made:
-                        neighbor_j = neighbor_j + 1
-                        print("cell in moves made")
-                    # if the cell is not in made moves, then append it to neighbor cells list
-                    else:
-                        neighbors.append(((neighbor_i, neighbor_j)))
-                        neighbor_j = neighbor_j + 1
-            neighbor_i = neighbor_i + 1
-
-        # Add neighboring cells to knowldege
-        print("cells neighbors: ", neighbors)
-        self.knowledge.append(Sentence(neighbors, count))
-        # mark cell as safe in knowledge
         self.mark_safe(cell)
 
-        # check if some cells can be marked as safe or mines based on the sentences in knowledge
-        base = copy.deepcopy(self.knowledge)
-        # iterates through the sentences in knowledge and checks if all cells are manes or safes
-        for sentence in self.knowledge:
-            if len(sentence.cells) == sentence.count:
-                cells = copy.deepcopy(sentence.cells)
-                for cell in cells:
-                    self.mark_mine(cell)
-                del sentence
-            else:
-                if sentence.count == 0:
-                    cells = copy.deepcopy(sentence.cells)
-                    for cell in cells:
-                        self.mark_safe(cell)
-                    del sentence
-        # checks for inferences based on the subsets explained in the background
-        for sentence in base:
-            if sentence.count == 0:
+        # Add a sentence about the neighbors not yet known to be safe or
+        # mines, leaving out the known mines from the count
+        cells = set()
+        for i in range(cell[0] - 1, cell[0] + 2):
+            for j in range(cell[1] - 1, cell[1] + 2):
+                if (i, j) == cell:
+                    continue
+                if not (0 <= i < self.height and 0 <= j < self.width):
+                    continue
+                if (i, j) in self.mines:
+                    count -= 1
+                elif (i, j) not in self.safes:
+                    cells.add((i, j))
+        if cells:
+            self.knowledge.append(Sentence(cells, count))
+
+        self.infer()
+
+    def infer(self):
+        """
+        Marks every cell that the knowledge base proves to be a mine or
+        safe, until nothing more can be concluded.
+        """
+        while True:
+
+            # Drop sentences with no cells left, and duplicates
+            knowledge = []
+            seen = set()
+            for sentence in self.knowledge:
+                key = (frozenset(sentence.cells), sentence.count)
+                if sentence.cells and key not in seen:
+                    seen.add(key)
+                    knowledge.append(sentence)
+            self.knowledge = knowledge
+            size = len(self.knowledge)
+
+            mines = set()
+            safes = set()
+            for component in self.components():
+                cells = set().union(*(s.cells for s in component))
+                if len(cells) <= MAX_COMPONENT:
+                    found = self.solve_component(component)
+                else:
+                    found = self.infer_subsets(component)
+                mines |= found[0]
+                safes |= found[1]
+
+            if not mines and not safes and len(self.knowledge) == size:
+                return
+            for cell in mines:
+                self.mark_mine(cell)
+            for cell in safes:
+                self.mark_safe(cell)
+
+    def components(self):
+        """
+        Returns the knowledge base split into lists of sentences that share
+        no cells with the sentences of any other list.
+        """
+        sentences = dict()
+        for n, sentence in enumerate(self.knowledge):
+            for cell in sentence.cells:
+                sentences.setdefault(cell, []).append(n)
+
+        components = []
+        visited = set()
+        for n in range(len(self.knowledge)):
+            if n in visited:
                 continue
-            for sentence2 in base:
-                if sentence == sentence2 or sentence2.count == 0:
+            visited.add(n)
+            component = []
+            frontier = [n]
+            while frontier:
+                sentence = self.knowledge[frontier.pop()]
+                component.append(sentence)
+                for cell in sentence.cells:
+                    for other in sentences[cell]:
+                        if other not in visited:
+                            visited.add(other)
+                            frontier.append(other)
+            components.append(component)
+        return components
+
+    def solve_component(self, sentences):
+        """
+        Enumerates the assignments of mines to the cells of `sentences` that
+        satisfy every sentence, and returns the sets of cells that are mines
+        in all of them and safe in all of them.
+
+        Cells are assigned one at a time, in the order the sentences reach
+        them, and a branch is abandoned as soon as a sentence has more mines
+        than its count or too few cells left to reach it. The enumeration
+        stops early once every cell has been seen both as a mine and safe.
+        """
+        cells = []
+        index = dict()
+        for sentence in sentences:
+            for cell in sorted(sentence.cells):
+                if cell not in index:
+                    index[cell] = len(cells)
+                    cells.append(cell)
+        members = [[] for _ in cells]
+        for n, sentence in enumerate(sentences):
+            for cell in sentence.cells:
+                members[index[cell]].append(n)
+
+        counts = [sentence.count for sentence in sentences]
+        mines = [0] * len(sentences)
+        unknown = [len(sentence.cells) for sentence in sentences]
+        assignment = [False] * len(cells)
+        seen_mine = [False] * len(cells)
+        seen_safe = [False] * len(cells)
+        undecided = [len(cells)]
+
+        def backtrack(k):
+            if k == len(cells):
+                for n, mine in enumerate(assignment):
+                    seen = seen_mine if mine else seen_safe
+                    if not seen[n]:
+                        seen[n] = True
+                        if seen_mine[n] and seen_safe[n]:
+                            undecided[0] -= 1
+                return undecided[0] == 0
+            for mine in (True, False):
+                consistent = True
+                for n in members[k]:
+                    unknown[n] -= 1
+                    mines[n] += mine
+                    if not mines[n] <= counts[n] <= mines[n] + unknown[n]:
+                        consistent = False
+                assignment[k] = mine
+                done = consistent and backtrack(k + 1)
+                for n in members[k]:
+                    unknown[n] += 1
+                    mines[n] -= mine
+                if done:
+                    return True
+            return False
+
+        backtrack(0)
+
+        # With no consistent assignment at all, conclude nothing
+        if not any(seen_mine) and not any(seen_safe):
+            return set(), set()
+        return (
+            {cell for n, cell in enumerate(cells) if not seen_safe[n]},
+            {cell for n, cell in enumerate(cells) if not seen_mine[n]}
+        )
+
+    def infer_subsets(self, sentences):
+        """
+        Fallback for components too large to enumerate: returns the cells
+        that single sentences prove to be mines or safe, and adds to the
+        knowledge base the difference of every sentence and its subsets.
+        """
+        mines = set()
+        safes = set()
+        for sentence in sentences:
+            mines |= sentence.known_mines() or set()
+            safes |= sentence.known_safes() or set()
+        for subset in sentences:
+            for sentence in sentences:
+                if subset is sentence:
                     continue
-                subset = sentence.cells
-                subset2 = sentence2.cells
-                subsetCount = sentence.count
-                subset2Count = sentence2.count
-
-                if subset.issubset(subset2):
-                    newSet = subset2.difference(subset)
-                    newCount = subset2Count - subsetCount
-                    for move in newSet:
-                        if move in self.moves_made:
-                            newSet.remove(move)
-                    if newSet:
-                        self.knowledge.append(Sentence(list(newSet), newCount))
+                if subset.cells < sentence.cells:
+                    inferred = Sentence(
+                        sentence.cells - subset.cells,
+                        sentence.count - subset.count
+                    )
+                    if inferred not in self.knowledge:
+                        self.knowledge.append(inferred)
+        return mines, safes
 
     def make_safe_move(self):
         """
@@ -0,0 +1,82 @@
+import math
+import sys
+
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in ["build", "verify"]:
+        sys.exit("Usage: python book.py build|verify")
+
+    if sys.argv[1] == "build":
+        book = build_book()
+        with open(ttt.BOOK, "wb") as f:
+            f.write(book)
+        positions = sum(1 for entry in book if entry != ttt.NOT_IN_BOOK)
+        print(f"Wrote {positions} positions to {ttt.BOOK}")
+    else:
+        if ttt.book is None:
+            sys.exit(f"No opening book at {ttt.BOOK}")
+        errors = verify_book()
+        for board, expected, found in errors:
+            print(f"{board}: search gives {expected}, book gives {found}")
+        if errors:
+            sys.exit(f"{len(errors)} positions disagree")
+        print("Opening book agrees with search on every position")
+
+
+def reachable_positions():
+    """
+    Returns every board that can be reached from the initial state,
+    including terminal boards.
+    """
+    positions = dict()
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index = ttt.book_index(board)
+        if index in positions:
+            continue
+        positions[index] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+
+def build_book():
+    """
+    Solves every reachable position with the bitboard engine and returns
+    the opening book as bytes.
+    """
+    book = bytearray([ttt.NOT_IN_BOOK] * 3 ** 9)
+    for board in reachable_positions():
+        value = ttt.bitboard_value(*ttt.to_bitboards(board))
+        action = ttt.minimax(board, use_book=False)
+        move = ttt.NO_ACTION if action is None else 3 * action[0] + action[1]
+        book[ttt.book_index(board)] = (value + 1) << 4 | move
+    return bytes(book)
+
+
+def verify_book():
+    """
+    Compares the loaded opening book with a live alpha-beta search on every
+    reachable position. Returns a list of (board, (action, value) from
+    search, (action, value) from the book) for each disagreement.
+    """
+    errors = []
+    for board in reachable_positions():
+        expected = (
+            ttt.minimax(board, bitboard=False, use_book=False),
+            ttt.alphaBetaPruning(
+                board, -math.inf, math.inf, ttt.player(board) == ttt.X
+            )
+        )
+        found = ttt.book_lookup(board)
+        if found != expected:
+            errors.append((board, expected, found))
+    return errors
+
+
+if __name__ == "__main__":
+    main()
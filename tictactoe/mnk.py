@@ -0,0 +1,328 @@
+"""
+m,n,k-game engine: two players take turns marking cells of an m x n board,
+and the first to get k in a row (across, down or diagonally) wins.
+Tic-tac-toe is the 3,3,3-game.
+"""
+
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position; wins found in fewer moves score higher
+WIN = 1000000
+
+# Nodes searched between checks of the clock
+CHECK = 1000
+
+# Directions a line can run in: across, down and the two diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class Timeout(Exception):
+    """Raised when a search runs out of time or is cancelled."""
+
+
+class Game():
+    """
+    State of an m,n,k-game, updated in place by `play` and `undo`.
+
+    Every window of k cells in a line is tracked with its number of X and O
+    marks, so a move only updates the windows through its own cell: that
+    is enough to detect a win and to keep the heuristic score up to date.
+    """
+
+    def __init__(self, m, n, k):
+        if not 1 <= k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cells = [EMPTY] * (m * n)
+        self.moves = []
+        self.turn = X
+        self.winner = None
+
+        # Windows of k cells in a line, and the windows through each cell
+        self.windows = []
+        self.through = [[] for _ in self.cells]
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    end = (i + di * (k - 1), j + dj * (k - 1))
+                    if not (0 <= end[0] < m and 0 <= end[1] < n):
+                        continue
+                    for step in range(k):
+                        cell = (i + di * step) * n + j + dj * step
+                        self.through[cell].append(len(self.windows))
+                    self.windows.append((i, j, di, dj))
+        self.xs = [0] * len(self.windows)
+        self.os = [0] * len(self.windows)
+
+        # A window that only one player has marked is worth 10 ** marks to
+        # them; `score` is the total for X minus the total for O
+        self.weights = [0] + [10 ** marks for marks in range(1, k + 1)]
+        self.score = 0
+
+    @classmethod
+    def from_board(cls, board, k):
+        """
+        Returns the game for a board (a list of rows of X, O or EMPTY)
+        in which k in a row wins.
+        """
+        game = cls(len(board), len(board[0]), k)
+        for i, row in enumerate(board):
+            for j, mark in enumerate(row):
+                if mark is not EMPTY:
+                    game.place(i * game.n + j, mark)
+        xs = sum(1 for mark in game.cells if mark == X)
+        game.turn = X if xs == len(game.moves) - xs else O
+        return game
+
+    def action(self, cell):
+        """Returns the (i, j) action for a cell number."""
+        return cell // self.n, cell % self.n
+
+    def cell(self, action):
+        """Returns the cell number of an (i, j) action."""
+        return action[0] * self.n + action[1]
+
+    def terminal(self):
+        """Returns True if the game is over."""
+        return self.winner is not None or len(self.moves) == len(self.cells)
+
+    def play(self, cell):
+        """Marks `cell` for the player to move."""
+        self.place(cell, self.turn)
+        self.turn = O if self.turn == X else X
+
+    def place(self, cell, mark):
+        if self.cells[cell] is not EMPTY:
+            raise ValueError(f"cell {self.action(cell)} is not empty")
+        self.cells[cell] = mark
+        self.moves.append(cell)
+        counts = self.xs if mark == X else self.os
+        for w in self.through[cell]:
+            self.score -= self.value(w)
+            counts[w] += 1
+            self.score += self.value(w)
+            if counts[w] == self.k and self.winner is None:
+                self.winner = mark
+
+    def undo(self):
+        """Takes back the last move."""
+        cell = self.moves.pop()
+        mark = self.cells[cell]
+        self.cells[cell] = EMPTY
+        counts = self.xs if mark == X else self.os
+        for w in self.through[cell]:
+            if counts[w] == self.k:
+                self.winner = None
+            self.score -= self.value(w)
+            counts[w] -= 1
+            self.score += self.value(w)
+        self.turn = mark
+
+    def value(self, w):
+        """Returns the heuristic value of window `w` for X."""
+        if self.os[w] == 0:
+            return self.weights[self.xs[w]]
+        if self.xs[w] == 0:
+            return -self.weights[self.os[w]]
+        return 0
+
+    def candidates(self):
+        """
+        Returns the empty cells next to a marked cell (or the center cell
+        of an empty board); on larger boards, moves far from every mark are
+        not worth searching.
+        """
+        if not self.moves:
+            return [self.cell((self.m // 2, self.n // 2))]
+        if self.m * self.n <= 16:
+            return [
+                cell for cell in range(len(self.cells))
+                if self.cells[cell] is EMPTY
+            ]
+        near = []
+        for cell in range(len(self.cells)):
+            if self.cells[cell] is not EMPTY:
+                continue
+            i, j = self.action(cell)
+            if any(
+                self.cells[a * self.n + b] is not EMPTY
+                for a in range(max(i - 1, 0), min(i + 2, self.m))
+                for b in range(max(j - 1, 0), min(j + 2, self.n))
+            ):
+                near.append(cell)
+        return near
+
+    def __str__(self):
+        return "\n".join(
+            " ".join(self.cells[i * self.n + j] or "." for j in range(self.n))
+            for i in range(self.m)
+        )
+
+
+class Search():
+    """
+    Iterative-deepening alpha-beta search on a `Game`, within a time budget.
+
+    Moves are ordered with the best move of the previous iteration first,
+    then two killer moves per ply (moves that recently caused a cutoff at
+    the same depth), then by the history heuristic (how much each move has
+    caused cutoffs anywhere in the tree). Positions at the depth limit are
+    scored by the game's heuristic.
+
+    `nodes` and `best` (the best action of the deepest finished iteration)
+    can be read from another thread while the search runs, and `cancel`
+    stops it early.
+    """
+
+    def __init__(self, game, budget=1.0, max_depth=None):
+        self.game = game
+        self.budget = budget
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.depth = 0
+        self.value = None
+        self.deadline = None
+        self.cancelled = False
+        self.best = None
+        self.killers = []
+        self.history = dict()
+
+    def cancel(self):
+        """Stops the search at its next check of the clock."""
+        self.cancelled = True
+
+    def best_action(self):
+        """
+        Returns the best action found for the player to move, searching one
+        ply deeper at a time until the game is solved, `max_depth` is
+        reached or the time budget runs out.
+        """
+        game = self.game
+        if game.terminal():
+            return None
+        self.deadline = time.perf_counter() + self.budget
+        remaining = len(game.cells) - len(game.moves)
+        max_depth = min(self.max_depth or remaining, remaining)
+        moves = game.candidates()
+        best = moves[0]
+        played = len(game.moves)
+        for depth in range(1, max_depth + 1):
+            self.killers = [[None, None] for _ in range(depth + 1)]
+            try:
+                value, move = self.root(moves, depth)
+            except Timeout:
+                # Take back the moves of the interrupted search
+                while len(game.moves) > played:
+                    game.undo()
+                break
+            best = move
+            self.best = game.action(move)
+            self.depth = depth
+            self.value = value
+
+            # Search the best move first in the next iteration, and stop
+            # once the result is certain
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= WIN - len(game.cells):
+                break
+        return game.action(best)
+
+    def root(self, moves, depth):
+        """Returns (value, move) of the best of `moves` at `depth`."""
+        alpha = -WIN - 1
+        best = None
+        for move in moves:
+            self.game.play(move)
+            value = -self.negamax(depth - 1, -WIN - 1, -alpha, 1)
+            self.game.undo()
+            if best is None or value > alpha:
+                alpha = value
+                best = move
+        return alpha, best
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move, searching
+        `depth` more plies.
+        """
+        game = self.game
+        self.nodes += 1
+        if self.nodes % CHECK == 0 and (
+            self.cancelled or time.perf_counter() > self.deadline
+        ):
+            raise Timeout()
+        if game.winner is not None:
+            # The last move won, so the player to move has lost
+            return -(WIN - ply)
+        if len(game.moves) == len(game.cells):
+            return 0
+        if depth == 0:
+            return game.score if game.turn == X else -game.score
+
+        best = -WIN - 1
+        for move in self.ordered(game.candidates(), ply):
+            game.play(move)
+            value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            game.undo()
+            if value > best:
+                best = value
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self.cutoff(move, depth, ply)
+                break
+        return best
+
+    def ordered(self, moves, ply):
+        """Returns `moves` with killer moves first, then by history."""
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        turn = self.game.turn
+        return sorted(moves, key=lambda move: (
+            move not in killers, -self.history.get((turn, move), 0)
+        ))
+
+    def cutoff(self, move, depth, ply):
+        """Records that `move` caused a beta cutoff."""
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        key = (self.game.turn, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+def best_action(board, k=3, budget=1.0):
+    """
+    Returns the best action found within `budget` seconds for the player to
+    move on a board of any size, in which k in a row wins.
+    """
+    return Search(Game.from_board(board, k), budget).best_action()
+
+
+def main():
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python mnk.py m n k [seconds per move]")
+    m, n, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) == 5 else 1.0
+
+    # Let the engine play both sides
+    game = Game(m, n, k)
+    while not game.terminal():
+        search = Search(game, budget)
+        action = search.best_action()
+        print(f"{game.turn} plays {action} (depth {search.depth}, "
+              f"{search.nodes} nodes, value {search.value})")
+        game.play(game.cell(action))
+    print(game)
+    print(f"Winner: {game.winner}" if game.winner else "Draw")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,58 @@
 import pygame
 import sys
+import threading
 import time
 
+import mnk
 import tictactoe as ttt
 
+# Frames drawn per second, also while the computer is thinking
+FPS = 30
+
+# Seconds the computer may search for each move
+AI_BUDGET = 2.0
+
+
+class Worker():
+    """
+    Computes the computer's move in a background thread, so that the window
+    keeps drawing and responding while the computer is thinking.
+    """
+
+    def __init__(self, board):
+        self.action = None
+        self.done = False
+        self.search = None
+
+        # The opening book answers at once, without a search
+        if ttt.book_lookup(board) is not None:
+            self.action = ttt.minimax(board)
+            self.done = True
+            return
+
+        self.search = mnk.Search(mnk.Game.from_board(board, 3), AI_BUDGET)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        action = self.search.best_action()
+        if not self.search.cancelled:
+            self.action = action
+            self.done = True
+
+    def cancel(self):
+        """Stops the search; its move will never be played."""
+        if self.search is not None:
+            self.search.cancel()
+
+    def progress(self):
+        """Returns a line describing the search so far."""
+        if self.search is None:
+            return "Opening book"
+        return (f"{self.search.nodes} nodes, depth {self.search.depth}, "
+                f"best so far {self.search.best}")
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -16,12 +65,15 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 16)
 
+clock = pygame.time.Clock()
 user = None
 board = ttt.initial_state()
-ai_turn = False
+worker = None
 
 while True:
+    clock.tick(FPS)
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -108,15 +160,18 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searching in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+            if worker is None:
+                worker = Worker(board)
+            elif worker.done:
+                board = ttt.result(board, worker.action)
+                worker = None
             else:
-                ai_turn = True
+                progress = smallFont.render(worker.progress(), True, white)
+                progressRect = progress.get_rect()
+                progressRect.center = ((width / 2), 62)
+                screen.blit(progress, progressRect)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +182,23 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render(
+            "Play Again" if game_over else "Reset", True, black
+        )
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                if worker is not None:
+                    worker.cancel()
+                user = None
+                board = ttt.initial_state()
+                worker = None
 
     pygame.display.flip()
@@ -4,6 +4,7 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
 
 X = "X"
 O = "O"
@@ -18,6 +19,15 @@ class InvalidActionForBoard(Error):
     pass
 
 
+class NodeCounter():
+    """
+    Counts the positions a search visits, when passed to `minimax`.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+
+
 def initial_state():
     """
     Returns starting state of the board.
@@ -136,7 +146,8 @@ def winner(board):
         threeInARow += 1
         winnerOfGame = board[i][j + 2]
 
-    if threeInARow == 0 or threeInARow > 1:
+    # A single move can complete two lines at once
+    if threeInARow == 0:
         return None
     else:
         return winnerOfGame
@@ -173,19 +184,30 @@ def utility(board):
 
 
 
-def minimax(board):
+def minimax(board, bitboard=True, use_book=True, counter=None):
     """
     Returns the optimal action for the current player on the board.
+    If `use_book` is True and the opening book is loaded, the action is
+    looked up in the book. Otherwise, if `bitboard` is True, positions are
+    evaluated by the bitboard engine and its transposition table, and if
+    not, by `alphaBetaPruning`. If `counter` is a NodeCounter, every
+    position searched is counted in it.
     """
-    print(player(board))
     if terminal(board):
         return None
+    entry = book_lookup(board) if use_book else None
+    if entry is not None:
+        return entry[0]
     else:
+        x, o = to_bitboards(board)
         if player(board) == "X":
             v = -math.inf
             bestMove = None
             for action in actions(board):
-                move = alphaBetaPruning(result(board, action), -math.inf, math.inf, False)
+                if bitboard:
+                    move = bitboard_value(x | cell_bit(action), o, counter)
+                else:
+                    move = alphaBetaPruning(result(board, action), -math.inf, math.inf, False, counter)
                 move = max(move, v)
                 if move == 1:
                     return action
@@ -199,7 +221,10 @@ def minimax(board):
             v = math.inf
             bestMove = None
             for action in actions(board):
-                move = alphaBetaPruning(result(board, action), -math.inf, math.inf, True)
+                if bitboard:
+                    move = bitboard_value(x, o | cell_bit(action), counter)
+                else:
+                    move = alphaBetaPruning(result(board, action), -math.inf, math.inf, True, counter)
                 move = min(move, v)
                 if move == -1:
                     return action
@@ -211,7 +236,10 @@ def minimax(board):
 
 
 
-def alphaBetaPruning(state, alpha, beta, maximizingPlayer):
+def alphaBetaPruning(state, alpha, beta, maximizingPlayer, counter=None):
+    if counter is not None:
+        counter.nodes += 1
+
     # if game over or cells are completed,
     if terminal(state):
         return utility(state)
@@ -219,7 +247,7 @@ def alphaBetaPruning(state, alpha, beta, maximizingPlayer):
     if maximizingPlayer:
         v = -math.inf
         for child in actions(state):
-            eval = alphaBetaPruning(result(state, child), alpha, beta, False)
+            eval = alphaBetaPruning(result(state, child), alpha, beta, False, counter)
             v = max(v, eval)
             alpha = max(alpha, eval)
             if beta <= alpha:
@@ -228,9 +256,183 @@ def alphaBetaPruning(state, alpha, beta, maximizingPlayer):
     else:
         v = math.inf
         for child in actions(state):
-            eval = alphaBetaPruning(result(state, child), alpha, beta, True)
+            eval = alphaBetaPruning(result(state, child), alpha, beta, True, counter)
             v = min(v, eval)
             beta = min(beta, eval)
             if beta <= alpha:
                 break
         return v
+
+
+# Bitboards: bit 3 * i + j of a player's bitboard is set if the player has
+# marked cell (i, j)
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+WINS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+
+def symmetry_tables():
+    """
+    Returns, for each of the 8 symmetries of the board (rotations and
+    reflections), a table mapping every bitboard to its image.
+    """
+    cells = [(i, j) for i in range(3) for j in range(3)]
+    transforms = [
+        lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+        lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i)
+    ]
+    tables = []
+    for transform in transforms:
+        image = [3 * a + b for a, b in (transform(i, j) for i, j in cells)]
+        table = []
+        for bits in range(FULL + 1):
+            mapped = 0
+            for k in range(9):
+                if bits >> k & 1:
+                    mapped |= 1 << image[k]
+            table.append(mapped)
+        tables.append(table)
+    return tables
+
+
+SYMMETRIES = symmetry_tables()
+
+# Minimax values of positions, keyed by canonical position
+transpositions = dict()
+
+
+def cell_bit(action):
+    """
+    Returns the bitboard with only cell `action` = (i, j) marked.
+    """
+    return 1 << (3 * action[0] + action[1])
+
+
+def to_bitboards(board):
+    """
+    Returns the (X, O) bitboards of a board.
+    """
+    x = 0
+    o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= cell_bit((i, j))
+            elif board[i][j] == O:
+                o |= cell_bit((i, j))
+    return x, o
+
+
+def canonical(x, o):
+    """
+    Returns a key shared by the position (x, o) and its 7 symmetric images.
+    """
+    return min(table[x] | table[o] << 9 for table in SYMMETRIES)
+
+
+def bitboard_winner(x, o):
+    """
+    Returns the winner of the position (x, o), if there is one.
+    """
+    for win in WINS:
+        if x & win == win:
+            return X
+        if o & win == win:
+            return O
+    return None
+
+
+def bitboard_value(x, o, counter=None):
+    """
+    Returns the minimax value of the position (x, o) with both players
+    playing optimally: 1 if X wins, -1 if O wins, 0 for a draw. If
+    `counter` is a NodeCounter, every position searched is counted in it.
+    """
+    if counter is not None:
+        counter.nodes += 1
+
+    key = canonical(x, o)
+    if key in transpositions:
+        return transpositions[key]
+
+    winning = bitboard_winner(x, o)
+    if winning is not None:
+        v = 1 if winning == X else -1
+    elif x | o == FULL:
+        v = 0
+    else:
+        xTurn = bin(x).count("1") == bin(o).count("1")
+        empty = ~(x | o) & FULL
+        values = []
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            if xTurn:
+                values.append(bitboard_value(x | bit, o, counter))
+            else:
+                values.append(bitboard_value(x, o | bit, counter))
+        v = max(values) if xTurn else min(values)
+
+    transpositions[key] = v
+    return v
+
+
+# Opening book written by book.py: one byte for every position, at
+# book_index(board), holding (value + 1) << 4 | (3 * i + j) for the best
+# action (i, j), or NOT_IN_BOOK for unreachable positions. Terminal
+# positions have NO_ACTION in place of an action.
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NOT_IN_BOOK = 0xFF
+NO_ACTION = 0xF
+
+
+def book_index(board):
+    """
+    Returns the index of a board in the opening book, reading its cells as
+    the digits of a base-3 number (0 for EMPTY, 1 for X, 2 for O).
+    """
+    index = 0
+    for i in range(2, -1, -1):
+        for j in range(2, -1, -1):
+            index = 3 * index + (0 if board[i][j] is EMPTY else 1 if board[i][j] == X else 2)
+    return index
+
+
+def load_book(filename=BOOK):
+    """
+    Returns the opening book in `filename`, or None if there is none or it
+    does not have one entry for each of the 3 ** 9 boards.
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename, "rb") as f:
+        contents = f.read()
+    if len(contents) != 3 ** 9:
+        return None
+    return contents
+
+
+def book_lookup(board):
+    """
+    Returns (best action, minimax value) for a board from the opening book,
+    with None as the action for terminal boards. Returns None if no book is
+    loaded or the board is not in it.
+    """
+    if book is None:
+        return None
+    entry = book[book_index(board)]
+    if entry == NOT_IN_BOOK:
+        return None
+    move = entry & 0xF
+    action = None if move == NO_ACTION else (move // 3, move % 3)
+    return action, (entry >> 4) - 1
+
+
+book = load_book()
@@ -0,0 +1,224 @@
+"""
+Headless tic-tac-toe tournament: plays engines against each other and
+against a random player, and measures how much each engine searches.
+"""
+
+import csv
+import json
+import random
+import sys
+import time
+
+import mnk
+import tictactoe as ttt
+
+# Number of random moves played before the engines take over
+OPENING = 2
+
+# Seconds per move for the m,n,k engine
+BUDGET = 1.0
+
+
+def alpha_beta(board, rng):
+    """The original search: minimax with `alphaBetaPruning`."""
+    counter = ttt.NodeCounter()
+    action = ttt.minimax(
+        board, bitboard=False, use_book=False, counter=counter
+    )
+    return action, counter.nodes
+
+
+def bitboard(board, rng):
+    """The bitboard engine, with its transposition table cleared."""
+    ttt.transpositions.clear()
+    counter = ttt.NodeCounter()
+    action = ttt.minimax(board, use_book=False, counter=counter)
+    return action, counter.nodes
+
+
+def book(board, rng):
+    """The opening book."""
+    return ttt.minimax(board), 0
+
+
+def iterative(board, rng):
+    """Iterative-deepening alpha-beta from the m,n,k engine."""
+    search = mnk.Search(mnk.Game.from_board(board, 3), BUDGET)
+    return search.best_action(), search.nodes
+
+
+def random_player(board, rng):
+    """A player that picks any available action."""
+    return rng.choice(sorted(ttt.actions(board))), 0
+
+
+ENGINES = {
+    "alphabeta": alpha_beta,
+    "bitboard": bitboard,
+    "book": book,
+    "mnk": iterative
+}
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python tournament.py games [results.csv|.json]")
+    games = int(sys.argv[1])
+    output = sys.argv[2] if len(sys.argv) == 3 else None
+    if ttt.book is None:
+        del ENGINES["book"]
+
+    results = run_tournament(games)
+    summary = summarize(results)
+    for name, stats in summary.items():
+        print(f"{name:10} {stats['moves']:6} moves  "
+              f"{stats['nodes_per_move']:10.1f} nodes/move  "
+              f"{1000 * stats['seconds_per_move']:8.3f} ms/move")
+        for opponents in ["random", "engines"]:
+            counts = stats[opponents]
+            print(f"{'':10} against {opponents:8} won {counts['won']}, "
+                  f"drew {counts['drew']}, lost {counts['lost']}")
+
+    if output is not None and output.endswith(".json"):
+        with open(output, "w") as f:
+            json.dump({"summary": summary, "games": results}, f, indent=2)
+    elif output is not None:
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=[
+                "game", "opening", "x", "o", "winner",
+                "x_nodes", "o_nodes", "x_seconds", "o_seconds"
+            ])
+            writer.writeheader()
+            for result in results:
+                writer.writerow({
+                    key: value for key, value in result.items()
+                    if key != "moves"
+                })
+
+
+def openings(games, seed=0):
+    """
+    Returns `games` starting boards, each after OPENING random moves.
+    """
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(games):
+        board = ttt.initial_state()
+        for _ in range(OPENING):
+            action = rng.choice(sorted(ttt.actions(board)))
+            board = ttt.result(board, action)
+        boards.append(board)
+    return boards
+
+
+def run_tournament(games, seed=0):
+    """
+    From each of `games` starting boards, plays every pairing of engines
+    and the random player, with each side as X and as O, except random
+    against itself. The random player uses the same seed in every game
+    from the same board. Returns a list of game records.
+    """
+    players = list(ENGINES) + ["random"]
+    pairings = [
+        (x, o) for x in players for o in players
+        if (x, o) != ("random", "random")
+    ]
+    results = []
+    for number, board in enumerate(openings(games, seed)):
+        for x, o in pairings:
+            record = play(board, x, o, random.Random(seed + number))
+            record["game"] = number
+            results.append(record)
+    return results
+
+
+def play(board, x, o, rng):
+    """
+    Plays a game from `board` between the engines named `x` and `o`, and
+    returns a record of the winner and of the search done for each move.
+    """
+    players = {ttt.X: x, ttt.O: o}
+    record = {
+        "opening": ttt.book_index(board),
+        "x": x,
+        "o": o,
+        "winner": None,
+        "x_nodes": 0,
+        "o_nodes": 0,
+        "x_seconds": 0.0,
+        "o_seconds": 0.0,
+        "moves": []
+    }
+    while not ttt.terminal(board):
+        turn = ttt.player(board)
+        name = players[turn]
+        engine = random_player if name == "random" else ENGINES[name]
+        start = time.perf_counter()
+        action, nodes = engine(board, rng)
+        seconds = time.perf_counter() - start
+        side = turn.lower()
+        record[f"{side}_nodes"] += nodes
+        record[f"{side}_seconds"] += seconds
+        record["moves"].append({
+            "player": name, "action": action,
+            "nodes": nodes, "seconds": seconds
+        })
+        board = ttt.result(board, action)
+    record["winner"] = ttt.winner(board)
+    return record
+
+
+def summarize(results):
+    """
+    Returns, for each engine, the moves it made, nodes and seconds per move
+    and its games won, drawn and lost against the random player and
+    against the other engines.
+    """
+    summary = dict()
+    for name in ENGINES:
+        moves = [
+            move for result in results for move in result["moves"]
+            if move["player"] == name
+        ]
+        summary[name] = {
+            "moves": len(moves),
+            "nodes_per_move": sum(move["nodes"] for move in moves)
+            / max(len(moves), 1),
+            "seconds_per_move": sum(move["seconds"] for move in moves)
+            / max(len(moves), 1),
+            "random": outcomes(results, name, ["random"]),
+            "engines": outcomes(
+                results, name, [other for other in ENGINES if other != name]
+            )
+        }
+    return summary
+
+
+def outcomes(results, name, opponents):
+    """
+    Returns the games the engine `name` won, drew and lost against any of
+    `opponents`.
+    """
+    counts = {"won": 0, "drew": 0, "lost": 0}
+    for result in results:
+        if (result["x"], result["o"]) in [
+            (name, opponent) for opponent in opponents
+        ]:
+            side = ttt.X
+        elif (result["o"], result["x"]) in [
+            (name, opponent) for opponent in opponents
+        ]:
+            side = ttt.O
+        else:
+            continue
+        if result["winner"] is None:
+            counts["drew"] += 1
+        elif result["winner"] == side:
+            counts["won"] += 1
+        else:
+            counts["lost"] += 1
+    return counts
+
+
+if __name__ == "__main__":
+    main()